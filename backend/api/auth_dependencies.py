@@ -1,12 +1,12 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from jose import jwt, JWTError
+import jwt
 from typing import Optional
 
 from database.db import get_db
 from database.repos import UserRepository
-from services.auth import SECRET_KEY, ALGORITHM
+from services.auth import SECRET_KEY_BYTES, ALGORITHM
 from api.models import TokenData
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
@@ -24,7 +24,7 @@ async def get_current_user(
 
     try:
         # Decode the JWT token
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, SECRET_KEY_BYTES, algorithms=[ALGORITHM])
         user_id: str = payload.get("sub")
         if user_id is None:
             raise credentials_exception
@@ -35,7 +35,7 @@ async def get_current_user(
             username=payload.get("username"),
             is_admin=payload.get("is_admin", False),
         )
-    except JWTError:
+    except jwt.PyJWTError:
         raise credentials_exception
 
     # Get user from database
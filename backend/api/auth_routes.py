@@ -2,7 +2,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from datetime import timedelta
 
 from database.db import get_db
 from database.repos import UserRepository
@@ -11,8 +10,7 @@ from services.auth import (
     get_password_hash,
     create_access_token,
     create_refresh_token,
-    ACCESS_TOKEN_EXPIRE_MINUTES,
-    REFRESH_TOKEN_EXPIRE_DAYS,
+    ACCESS_DELTA,
 )
 from api.models import User, UserCreate, Token
 from api.auth_dependencies import get_current_user
@@ -48,13 +46,10 @@ async def login_for_access_token(
         )
 
     # Create access token data with user ID as subject
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     token_data = {"sub": user.id, "username": user.username, "is_admin": user.is_admin}
 
     # Create access token
-    access_token = create_access_token(
-        data=token_data, expires_delta=access_token_expires
-    )
+    access_token = create_access_token(data=token_data, expires_delta=ACCESS_DELTA)
 
     return {"access_token": access_token, "token_type": "bearer"}
 
@@ -65,16 +60,13 @@ async def refresh_token(
 ):
     """Create a new access token using the refresh token"""
     # Create new access token
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     token_data = {
         "sub": current_user.id,
         "username": current_user.username,
         "is_admin": current_user.is_admin,
     }
 
-    access_token = create_access_token(
-        data=token_data, expires_delta=access_token_expires
-    )
+    access_token = create_access_token(data=token_data, expires_delta=ACCESS_DELTA)
 
     return {"access_token": access_token, "token_type": "bearer"}
 
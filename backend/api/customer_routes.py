@@ -7,6 +7,7 @@ from fastapi import UploadFile, File
 import aiofiles
 from api.models import Customer, CustomerCreate, CustomerUpdate, CustomerBase
 from api.auth_dependencies import get_current_user
+from database import cache
 from database.db import get_db
 from database.repos import CustomerRepository, VehicleRepository
 
@@ -167,7 +168,10 @@ async def get_customer(customer_id: str, db: Session = Depends(get_db)):
 @router.get("/customers", response_model=List[Customer])
 async def list_customers(db: Session = Depends(get_db)):
     """List all customers"""
-    return CustomerRepository.get_all(db)
+    return cache.get_or_load(
+        "customers",
+        lambda: [Customer.model_validate(c) for c in CustomerRepository.get_all(db)],
+    )
 
 
 @router.put("/customers/{customer_id}", response_model=Customer)
@@ -200,7 +204,12 @@ async def get_customer(
     db: Session = Depends(get_db),
 ):
     """Get a customer by ID"""
-    customer = CustomerRepository.get_by_id(db, customer_id)
+
+    def load():
+        customer = CustomerRepository.get_by_id(db, customer_id)
+        return Customer.model_validate(customer) if customer else None
+
+    customer = cache.get_or_load(f"customer:{customer_id}", load)
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
     return customer
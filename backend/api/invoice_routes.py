@@ -10,7 +10,7 @@ from database.db import get_db
 from database.repos import WorkOrderRepository, CustomerRepository, VehicleRepository
 from services.invoice_generator_html import (
     generate_invoice_html,
-    generate_pdf_with_reportlab,
+    generate_invoice_html_and_pdf,
 )
 # from services.email_service import send_email_with_attachment
 
@@ -58,10 +58,17 @@ async def generate_invoice(
     if work_order.vehicle_id:
         vehicle = VehicleRepository.get_by_id(db, work_order.vehicle_id)
 
-    # Generate HTML invoice using template
-    html_content, html_path, template_data = await generate_invoice_html(
-        work_order, customer, vehicle, is_estimate=False
-    )
+    # Generate HTML invoice using template, and the PDF alongside it if requested
+    pdf_path = None
+    if request.generate_pdf:
+        print("Generating PDF with ReportLab...")
+        html_content, html_path, pdf_path = await generate_invoice_html_and_pdf(
+            work_order, customer, vehicle, is_estimate=False
+        )
+    else:
+        html_content, html_path, _ = await generate_invoice_html(
+            work_order, customer, vehicle, is_estimate=False
+        )
 
     if not html_content:
         raise HTTPException(status_code=500, detail="Failed to generate invoice")
@@ -71,13 +78,7 @@ async def generate_invoice(
 
     result = {"status": "success", "html_content": html_content, "html_path": html_path}
 
-    # Generate PDF if requested
-    pdf_path = None
     if request.generate_pdf:
-        print("Generating PDF with ReportLab...")
-        # Generate PDF using ReportLab
-        pdf_path = await generate_pdf_with_reportlab(template_data)
-
         if pdf_path:
             result["pdf_path"] = pdf_path
         else:
@@ -138,10 +139,17 @@ async def generate_estimate(
     if work_order.vehicle_id:
         vehicle = VehicleRepository.get_by_id(db, work_order.vehicle_id)
 
-    # Generate HTML estimate using template
-    html_content, html_path, template_data = await generate_invoice_html(
-        work_order, customer, vehicle, is_estimate=True
-    )
+    # Generate HTML estimate using template, and the PDF alongside it if requested
+    pdf_path = None
+    if request.generate_pdf:
+        print("Generating PDF with ReportLab...")
+        html_content, html_path, pdf_path = await generate_invoice_html_and_pdf(
+            work_order, customer, vehicle, is_estimate=True
+        )
+    else:
+        html_content, html_path, _ = await generate_invoice_html(
+            work_order, customer, vehicle, is_estimate=True
+        )
 
     if not html_content:
         raise HTTPException(status_code=500, detail="Failed to generate estimate")
@@ -151,13 +159,7 @@ async def generate_estimate(
 
     result = {"status": "success", "html_content": html_content, "html_path": html_path}
 
-    # Generate PDF if requested
-    pdf_path = None
     if request.generate_pdf:
-        print("Generating PDF with ReportLab...")
-        # Generate PDF using ReportLab
-        pdf_path = await generate_pdf_with_reportlab(template_data)
-
         if pdf_path:
             result["pdf_path"] = pdf_path
         else:
@@ -4,6 +4,7 @@ from typing import List
 import uuid
 from datetime import datetime
 
+from database import cache
 from database.db import get_db
 
 from api.models import Vehicle, VehicleCreate, VehicleUpdate
@@ -38,7 +39,12 @@ async def create_vehicle(vehicle: VehicleCreate, db: Session = Depends(get_db)):
 @router.get("/vehicles/{vehicle_id}", response_model=Vehicle)
 async def get_vehicle(vehicle_id: str, db: Session = Depends(get_db)):
     """Get a vehicle by ID"""
-    vehicle = VehicleRepository.get_by_id(db, vehicle_id)
+
+    def load():
+        vehicle = VehicleRepository.get_by_id(db, vehicle_id)
+        return Vehicle.model_validate(vehicle) if vehicle else None
+
+    vehicle = cache.get_or_load(f"vehicle:{vehicle_id}", load)
     if not vehicle:
         raise HTTPException(status_code=404, detail="Vehicle not found")
     return vehicle
@@ -17,14 +17,11 @@ from sqlalchemy.orm import Session
 
 from api.models import WorkOrder, Customer, Vehicle, WorkOrderUpdate
 from services.audio import transcribe_audio
-from services.image import (
-    extract_vin_from_image,
-    read_odometer_image,
-    read_plate_from_image,
-)
+from services.image import extract_all_one_call
 from services.generate import generate_work_summary
 from services.vehicle_info import get_year_make_model
 from database.repos import WorkOrderRepository, CustomerRepository, VehicleRepository
+from database import cache
 from database.db import get_db
 
 router = APIRouter()
@@ -206,23 +203,41 @@ async def process_uploads(
             "processing_notes": work_order.processing_notes or [],
         }
 
-        # Process VIN image
-        vin = None
-        if vin_content:
+        # Save the images, then read them all concurrently
+        image_uploads = {
+            "vin": ("vin", vin_content, vin_filename),
+            "odometer": ("odo", odometer_content, odometer_filename),
+            "plate": ("plate", plate_content, plate_filename),
+        }
+        image_paths = {}
+        image_errors = {}
+        os.makedirs(os.path.join(UPLOAD_DIR, "images"), exist_ok=True)
+        for key, (suffix, content, filename) in image_uploads.items():
+            if not content:
+                continue
             try:
-                # Ensure directory exists
-                os.makedirs(os.path.join(UPLOAD_DIR, "images"), exist_ok=True)
-
-                vin_path = os.path.join(
+                path = os.path.join(
                     UPLOAD_DIR,
                     "images",
-                    f"{order_id}_vin{os.path.splitext(vin_filename)[1]}",
+                    f"{order_id}_{suffix}{os.path.splitext(filename)[1]}",
                 )
-                print("Getting vin image")
-                async with aiofiles.open(vin_path, "wb") as f:
-                    await f.write(vin_content)
+                print(f"Getting {key} image")
+                async with aiofiles.open(path, "wb") as f:
+                    await f.write(content)
+                image_paths[key] = path
+            except Exception as e:
+                image_errors[key] = e
+        extracted = await extract_all_one_call(image_paths)
+        extracted.update(image_errors)
 
-                vin = await extract_vin_from_image(vin_path)
+        # Process VIN image
+        vin = None
+        if "vin" in extracted:
+            try:
+                result = extracted["vin"]
+                if isinstance(result, Exception):
+                    raise result
+                vin = result
                 update_data["processing_notes"].append("VIN image processed")
 
                 if vin:
@@ -241,18 +256,12 @@ async def process_uploads(
 
         # Process odometer image
         odometer = None
-        if odometer_content:
+        if "odometer" in extracted:
             try:
-                os.makedirs(os.path.join(UPLOAD_DIR, "images"), exist_ok=True)
-                odo_path = os.path.join(
-                    UPLOAD_DIR,
-                    "images",
-                    f"{order_id}_odo{os.path.splitext(odometer_filename)[1]}",
-                )
-                print("Getting odometer image")
-                async with aiofiles.open(odo_path, "wb") as f:
-                    await f.write(odometer_content)
-                odometer = await read_odometer_image(odo_path)
+                result = extracted["odometer"]
+                if isinstance(result, Exception):
+                    raise result
+                odometer = result
                 update_data["processing_notes"].append("Odometer image processed")
 
                 if odometer:
@@ -271,18 +280,12 @@ async def process_uploads(
                 )
 
         plate = None
-        if plate_content:
+        if "plate" in extracted:
             try:
-                os.makedirs(os.path.join(UPLOAD_DIR, "images"), exist_ok=True)
-                plate_path = os.path.join(
-                    UPLOAD_DIR,
-                    "images",
-                    f"{order_id}_plate{os.path.splitext(plate_filename)[1]}",
-                )
-                print("Getting plate image")
-                async with aiofiles.open(plate_path, "wb") as f:
-                    await f.write(plate_content)
-                plate = await read_plate_from_image(plate_path)
+                result = extracted["plate"]
+                if isinstance(result, Exception):
+                    raise result
+                plate = result
                 update_data["processing_notes"].append("Plate image processed")
                 if plate:
                     vehicle_info["plate"] = plate
@@ -529,7 +532,10 @@ async def get_work_order(order_id: str, db: Session = Depends(get_db)):
 @router.get("/work-orders", response_model=List[WorkOrder])
 async def list_work_orders(db: Session = Depends(get_db)):
     """List all work orders"""
-    return WorkOrderRepository.get_all(db)
+    return cache.get_or_load(
+        "work_orders",
+        lambda: [WorkOrder.model_validate(w) for w in WorkOrderRepository.get_all(db)],
+    )
 
 
 @router.get("/customers/{customer_id}/work-orders", response_model=List[WorkOrder])
@@ -0,0 +1,40 @@
+"""In-process read cache for list/detail lookups.
+
+Entries hold Pydantic models rather than ORM instances so they can be shared
+safely across sessions. Repositories invalidate the affected keys on write.
+"""
+
+import os
+from threading import Lock
+from typing import Any, Callable
+
+from cachetools import TTLCache
+
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", "60"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+
+_cache = TTLCache(maxsize=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS)
+_lock = Lock()
+_MISSING = object()
+
+
+def get_or_load(key: str, loader: Callable[[], Any]) -> Any:
+    """Return the cached value for key, calling loader on a miss
+
+    None results are not cached so missing rows are looked up again.
+    """
+    with _lock:
+        value = _cache.get(key, _MISSING)
+    if value is _MISSING:
+        value = loader()
+        if value is not None:
+            with _lock:
+                _cache[key] = value
+    return value
+
+
+def invalidate(*keys: str):
+    """Drop keys from the cache"""
+    with _lock:
+        for key in keys:
+            _cache.pop(key, None)
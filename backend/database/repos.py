@@ -1,9 +1,31 @@
 from datetime import datetime
+import logging
 import uuid
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 from typing import Dict, Any, List, Optional
 
 from .db import UserDB, CustomerDB, VehicleDB, WorkOrderDB
+from .cache import invalidate
+
+logger = logging.getLogger(__name__)
+
+
+def _update_returning(db: Session, model, row_id: str, data: Dict[str, Any]):
+    """Update one row with a single UPDATE ... RETURNING statement
+
+    Skips loading the row and per-attribute change tracking; returns None
+    when no row has the given id.
+    """
+    stmt = (
+        update(model)
+        .where(model.id == row_id)
+        .values({**data, "updated_at": datetime.now()})
+        .returning(model)
+    )
+    row = db.scalars(stmt, execution_options={"populate_existing": True}).one_or_none()
+    db.commit()
+    return row
 
 
 class UserRepository:
@@ -22,24 +44,11 @@ class UserRepository:
     def update(
         db: Session, user_id: str, user_data: Dict[str, Any]
     ) -> Optional[UserDB]:
-        user = db.query(UserDB).filter(UserDB.id == user_id).first()
-        if not user:
-            return None
-
-        # Update fields
-        for key, value in user_data.items():
-            setattr(user, key, value)
-
-        # Always update the updated_at timestamp
-        user.updated_at = datetime.now()
-
-        db.commit()
-        db.refresh(user)
-        return user
+        return _update_returning(db, UserDB, user_id, user_data)
 
     @staticmethod
     def delete(db: Session, user_id: str) -> bool:
-        user = db.query(UserDB).filter(UserDB.id == user_id).first()
+        user = db.scalars(select(UserDB).where(UserDB.id == user_id)).first()
         if not user:
             return False
 
@@ -49,19 +58,19 @@ class UserRepository:
 
     @staticmethod
     def get_by_id(db: Session, user_id: str) -> Optional[UserDB]:
-        return db.query(UserDB).filter(UserDB.id == user_id).first()
+        return db.scalars(select(UserDB).where(UserDB.id == user_id)).first()
 
     @staticmethod
     def get_by_username(db: Session, username: str) -> Optional[UserDB]:
-        return db.query(UserDB).filter(UserDB.username == username).first()
+        return db.scalars(select(UserDB).where(UserDB.username == username)).first()
 
     @staticmethod
     def get_by_email(db: Session, email: str) -> Optional[UserDB]:
-        return db.query(UserDB).filter(UserDB.email == email).first()
+        return db.scalars(select(UserDB).where(UserDB.email == email)).first()
 
     @staticmethod
     def get_all(db: Session) -> List[UserDB]:
-        return db.query(UserDB).all()
+        return db.scalars(select(UserDB)).all()
 
 
 class CustomerRepository:
@@ -74,52 +83,50 @@ class CustomerRepository:
         db.add(customer_db)
         db.commit()
         db.refresh(customer_db)
+        invalidate("customers")
         return customer_db
 
     @staticmethod
     def update(
         db: Session, customer_id: str, customer_data: Dict[str, Any]
     ) -> Optional[CustomerDB]:
-        customer = db.query(CustomerDB).filter(CustomerDB.id == customer_id).first()
+        customer = _update_returning(db, CustomerDB, customer_id, customer_data)
         if not customer:
             return None
 
-        # Update fields
-        for key, value in customer_data.items():
-            setattr(customer, key, value)
-
-        # Always update the updated_at timestamp
-        customer.updated_at = datetime.now()
-
-        db.commit()
-        db.refresh(customer)
+        invalidate(f"customer:{customer_id}", "customers")
         return customer
 
     @staticmethod
     def delete(db: Session, customer_id: str) -> bool:
-        customer = db.query(CustomerDB).filter(CustomerDB.id == customer_id).first()
+        customer = db.scalars(
+            select(CustomerDB).where(CustomerDB.id == customer_id)
+        ).first()
         if not customer:
             return False
 
         db.delete(customer)
         db.commit()
+        invalidate(f"customer:{customer_id}", "customers")
         return True
 
     @staticmethod
     def get_by_id(db: Session, customer_id: str) -> Optional[CustomerDB]:
-        return db.query(CustomerDB).filter(CustomerDB.id == customer_id).first()
+        return db.scalars(
+            select(CustomerDB).where(CustomerDB.id == customer_id)
+        ).first()
 
     @staticmethod
     def get_by_phone(db: Session, phone: str) -> Optional[CustomerDB]:
-        return db.query(CustomerDB).filter(CustomerDB.phone == phone).first()
+        return db.scalars(select(CustomerDB).where(CustomerDB.phone == phone)).first()
 
     @staticmethod
     def get_by_email(db: Session, email: str) -> Optional[CustomerDB]:
-        return db.query(CustomerDB).filter(CustomerDB.email == email).first()
+        return db.scalars(select(CustomerDB).where(CustomerDB.email == email)).first()
 
     @staticmethod
     def get_all(db: Session) -> List[CustomerDB]:
-        return db.query(CustomerDB).all()
+        return db.scalars(select(CustomerDB)).all()
 
 
 class VehicleRepository:
@@ -134,7 +141,9 @@ class VehicleRepository:
         db.refresh(vehicle_db)
         customer_id = vehicle_data.get("customer_id")
         if customer_id:
-            customer = db.query(CustomerDB).filter(CustomerDB.id == customer_id).first()
+            customer = db.scalars(
+                select(CustomerDB).where(CustomerDB.id == customer_id)
+            ).first()
             if customer:
                 vehicles = customer.vehicles or []
                 if vehicle_db.id not in vehicles:
@@ -142,6 +151,7 @@ class VehicleRepository:
                     customer.vehicles = vehicles
                     customer.updated_at = datetime.now()
                     db.commit()
+                    invalidate(f"customer:{customer_id}", "customers")
 
         return vehicle_db
 
@@ -149,96 +159,94 @@ class VehicleRepository:
     def update(
         db: Session, vehicle_id: str, vehicle_data: Dict[str, Any]
     ) -> Optional[VehicleDB]:
-        vehicle = db.query(VehicleDB).filter(VehicleDB.id == vehicle_id).first()
+        vehicle = _update_returning(db, VehicleDB, vehicle_id, vehicle_data)
         if not vehicle:
             return None
 
-        # Update fields
-        for key, value in vehicle_data.items():
-            setattr(vehicle, key, value)
-
-        # Always update the updated_at timestamp
-        vehicle.updated_at = datetime.now()
-
-        db.commit()
-        db.refresh(vehicle)
+        invalidate(f"vehicle:{vehicle_id}")
         return vehicle
 
     @staticmethod
     def delete(db: Session, vehicle_id: str) -> bool:
-        vehicle = db.query(VehicleDB).filter(VehicleDB.id == vehicle_id).first()
+        vehicle = db.scalars(
+            select(VehicleDB).where(VehicleDB.id == vehicle_id)
+        ).first()
         if not vehicle:
             return False
 
+        customer_id = vehicle.customer_id
         db.delete(vehicle)
         db.commit()
+        invalidate(f"vehicle:{vehicle_id}")
+        if customer_id:
+            invalidate(f"customer:{customer_id}", "customers")
         return True
 
     @staticmethod
     def get_by_id(db: Session, vehicle_id: str) -> Optional[VehicleDB]:
-        return db.query(VehicleDB).filter(VehicleDB.id == vehicle_id).first()
+        return db.scalars(select(VehicleDB).where(VehicleDB.id == vehicle_id)).first()
 
     @staticmethod
     def get_by_vin(db: Session, vin: str) -> Optional[VehicleDB]:
-        return db.query(VehicleDB).filter(VehicleDB.vin == vin).first()
+        return db.scalars(select(VehicleDB).where(VehicleDB.vin == vin)).first()
 
     @staticmethod
     def get_by_customer(db: Session, customer_id: str) -> List[VehicleDB]:
-        return db.query(VehicleDB).filter(VehicleDB.customer_id == customer_id).all()
+        return db.scalars(
+            select(VehicleDB).where(VehicleDB.customer_id == customer_id)
+        ).all()
 
     @staticmethod
     def get_all(db: Session) -> List[VehicleDB]:
-        return db.query(VehicleDB).all()
+        return db.scalars(select(VehicleDB)).all()
 
 
 class WorkOrderRepository:
     @staticmethod
     def create(db, work_order_data):
         work_order_db = WorkOrderDB(**work_order_data)
-        print(f"Creating work order with {work_order_data}")
+        logger.debug("Creating work order id=%s", work_order_data.get("id"))
         db.add(work_order_db)
         db.commit()
         db.refresh(work_order_db)
+        invalidate("work_orders")
         return work_order_db
 
     @staticmethod
     def update(db, order_id, work_order_data):
-        work_order = db.query(WorkOrderDB).filter(WorkOrderDB.id == order_id).first()
+        logger.debug(
+            "Updating work order id=%s fields=%s", order_id, list(work_order_data)
+        )
+        work_order = _update_returning(db, WorkOrderDB, order_id, work_order_data)
         if not work_order:
             return None
 
-        # Update fields
-        print(f"Updating work order with {work_order_data}")
-        for key, value in work_order_data.items():
-            setattr(work_order, key, value)
-
-        # Always update the updated_at timestamp
-        work_order.updated_at = datetime.now()
-
-        db.commit()
-        db.refresh(work_order)
+        invalidate("work_orders")
         return work_order
 
     @staticmethod
     def delete(db, order_id):
-        work_order = db.query(WorkOrderDB).filter(WorkOrderDB.id == order_id).first()
+        work_order = db.scalars(
+            select(WorkOrderDB).where(WorkOrderDB.id == order_id)
+        ).first()
         if not work_order:
             return False
 
         db.delete(work_order)
         db.commit()
+        invalidate("work_orders")
         return True
 
     @staticmethod
     def get_by_id(db, order_id):
-        return db.query(WorkOrderDB).filter(WorkOrderDB.id == order_id).first()
+        return db.scalars(select(WorkOrderDB).where(WorkOrderDB.id == order_id)).first()
 
     @staticmethod
     def get_by_customer(db, customer_id):
-        return (
-            db.query(WorkOrderDB).filter(WorkOrderDB.customer_id == customer_id).all()
-        )
+        return db.scalars(
+            select(WorkOrderDB).where(WorkOrderDB.customer_id == customer_id)
+        ).all()
 
     @staticmethod
     def get_all(db):
-        return db.query(WorkOrderDB).all()
+        return db.scalars(select(WorkOrderDB)).all()
@@ -1,27 +1,26 @@
 import os
+from pathlib import Path
+from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
+# Load .env once, before any module reads its settings at import time
+load_dotenv()
+
 from api.auth_routes import router as auth_router
 from api.workorder_routes import router as workorder_router
 from api.customer_routes import router as customer_router
 from api.vehicle_routes import router as vehicle_router
 from api.invoice_routes import router as invoice_router
 from database.db import init_db
-from dotenv import load_dotenv
-
-load_dotenv()
+from services.http_client import close_clients
+from services.invoice_generator_html import shutdown_pdf_pool
 
 # Environment variables
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-UPLOAD_DIR = os.getenv("UPLOAD_DIR", "./uploads")
-INVOICE_DIR = os.getenv("INVOICE_DIR", "./invoices")
-
-# Create upload directories
-os.makedirs(os.path.join(UPLOAD_DIR, "audio"), exist_ok=True)
-os.makedirs(os.path.join(UPLOAD_DIR, "images"), exist_ok=True)
-os.makedirs(INVOICE_DIR, exist_ok=True)
+UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", "./uploads"))
+INVOICE_DIR = Path(os.getenv("INVOICE_DIR", "./invoices"))
 
 # Initialize FastAPI app
 app = FastAPI(title="Auto Shop Work Order API")
@@ -51,6 +50,19 @@ app.include_router(vehicle_router, prefix="/api/v1", tags=["vehicles"])
 app.include_router(invoice_router, prefix="/api/v1", tags=["invoices"])
 
 
+@app.on_event("startup")
+async def startup_event():
+    # Create upload and invoice directories
+    for path in (UPLOAD_DIR / "audio", UPLOAD_DIR / "images", INVOICE_DIR):
+        path.mkdir(parents=True, exist_ok=True)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await close_clients()
+    shutdown_pdf_pool()
+
+
 @app.get("/")
 async def root():
     return {"message": "Auto Shop Work Order API is running"}
@@ -1,30 +1,50 @@
-import os
-from openai import OpenAI
 import asyncio
-from dotenv import load_dotenv, dotenv_values
+import os
+
+from services.http_client import get_openai_client
+
+# "openai" uses the Whisper API; "local" runs faster-whisper on this host
+TRANSCRIBE_BACKEND = os.getenv("TRANSCRIBE_BACKEND", "openai")
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "small.en")
+WHISPER_DEVICE = os.getenv("WHISPER_DEVICE", "cpu")
+WHISPER_COMPUTE_TYPE = os.getenv(
+    "WHISPER_COMPUTE_TYPE", "float16" if WHISPER_DEVICE == "cuda" else "int8"
+)
 
-load_dotenv()
+whisper_model = None
+if TRANSCRIBE_BACKEND == "local":
+    # Optional dependency, only needed for local transcription
+    from faster_whisper import WhisperModel
+
+    whisper_model = WhisperModel(
+        WHISPER_MODEL, device=WHISPER_DEVICE, compute_type=WHISPER_COMPUTE_TYPE
+    )
+
+
+def transcribe_local(file_path):
+    """Transcribe an audio file with the local faster-whisper model"""
+    segments, _ = whisper_model.transcribe(file_path, beam_size=1)
+    return " ".join(segment.text.strip() for segment in segments)
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-openai_client = OpenAI(api_key=OPENAI_API_KEY)
 
 async def transcribe_audio(file_path, api_key=None):
-    """Transcribe an audio file using OpenAI Whisper API"""
+    """Transcribe an audio file using OpenAI Whisper API or a local model"""
     try:
-        loop = asyncio.get_running_loop()
-        
-        def transcribe():
+        if whisper_model is not None:
+            transcript = await asyncio.to_thread(transcribe_local, file_path)
+        else:
+            client = get_openai_client()
             with open(file_path, "rb") as audio_file:
-                response = openai_client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file
+                response = await client.post(
+                    "/audio/transcriptions",
+                    data={"model": "whisper-1"},
+                    files={"file": (os.path.basename(file_path), audio_file)},
                 )
-                return response.text
-        
-        transcript = await loop.run_in_executor(None, transcribe)
+            response.raise_for_status()
+            transcript = response.json()["text"]
         print("Transcript:", transcript)
         return transcript
-        
+
     except Exception as e:
         print(f"Error transcribing audio: {e}")
         return ""
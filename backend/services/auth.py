@@ -1,18 +1,23 @@
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import jwt, JWTError
+import jwt
 from passlib.context import CryptContext
 import os
-from dotenv import load_dotenv
-
-load_dotenv()
 
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your_secret_key_here")
+# Encode the signing key once instead of on every token
+SECRET_KEY_BYTES = SECRET_KEY.encode("utf-8")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 7
+ACCESS_DELTA = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+REFRESH_DELTA = timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "10"))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Existing hashes with a higher cost still verify; new hashes use BCRYPT_ROUNDS
+pwd_context = CryptContext(
+    schemes=["bcrypt"], bcrypt__rounds=BCRYPT_ROUNDS, deprecated="auto"
+)
 
 
 def verify_password(plain_password, hashed_password):
@@ -28,26 +33,18 @@ def get_password_hash(password):
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a new JWT access token"""
     to_encode = data.copy()
-
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    expire = datetime.utcnow() + (expires_delta or ACCESS_DELTA)
 
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, SECRET_KEY_BYTES, algorithm=ALGORITHM)
     return encoded_jwt
 
 
 def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a new JWT refresh token"""
     to_encode = data.copy()
-
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    expire = datetime.utcnow() + (expires_delta or REFRESH_DELTA)
 
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, SECRET_KEY_BYTES, algorithm=ALGORITHM)
     return encoded_jwt
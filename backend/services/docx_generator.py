@@ -1,16 +1,15 @@
+import asyncio
 import os
-import uuid
 from datetime import datetime
-from dotenv import load_dotenv
+from io import BytesIO
+from pathlib import Path
+from xml.sax.saxutils import escape
 from docx import Document
-from docx.shared import Pt, Inches, RGBColor
+from docx.shared import Pt, Inches
 from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.enum.table import WD_ALIGN_VERTICAL, WD_TABLE_ALIGNMENT
 from docx.oxml.ns import nsdecls
 from docx.oxml import parse_xml
 
-load_dotenv()
-
 # Configuration from environment variables
 INVOICE_DIR = os.getenv("INVOICE_DIR", "./invoices")
 COMPANY_NAME = os.getenv("COMPANY_NAME", "Auto Shop")
@@ -21,17 +20,257 @@ COMPANY_WEBSITE = os.getenv("COMPANY_WEBSITE", "www.yourautoshop.com")
 LOGO_PATH = os.getenv("LOGO_PATH", None)  # Optional path to logo
 
 # Ensure invoice directory exists
-os.makedirs(INVOICE_DIR, exist_ok=True)
+_INVOICE_DIR_PATH = Path(INVOICE_DIR)
+_INVOICE_DIR_PATH.mkdir(parents=True, exist_ok=True)
+
+HEADER_COLOR = "3B71CA"  # Dark blue
+HEADER_TEXT_COLOR = "FFFFFF"  # White
+ZEBRA_COLOR = "F5F5F5"  # Light gray
+
+_NSDECLS_W = nsdecls("w")
+
+# Column widths in inches
+HEADER_TABLE_WIDTHS = (4.0, 2.5)
+LABEL_TABLE_WIDTHS = (1.5, 3.0)
+LINE_ITEMS_TABLE_WIDTHS = (3.5, 1.0, 1.0, 1.0, 1.0)
+
+CUSTOMER_LABELS = ("Customer:", "Phone:", "Email:", "Address:")
+VEHICLE_LABELS = ("Year/Make/Model:", "VIN:", "Mileage:")
+
+def _paragraph_xml(text, bold=False, align=None, color=None):
+    """Build the WordprocessingML for a single-run paragraph"""
+    ppr = f'<w:pPr><w:jc w:val="{align}"/></w:pPr>' if align else ""
+    if text is None or text == "":
+        return f"<w:p>{ppr}</w:p>"
+    rpr = ""
+    if bold or color:
+        rpr = "<w:rPr>"
+        if bold:
+            rpr += "<w:b/>"
+        if color:
+            rpr += f'<w:color w:val="{color}"/>'
+        rpr += "</w:rPr>"
+    return f'<w:p>{ppr}<w:r>{rpr}<w:t xml:space="preserve">{escape(str(text))}</w:t></w:r></w:p>'
+
+def _row_xml(texts, widths, bolds=None, aligns=None, shade=None, color=None):
+    """Build the WordprocessingML for a table row of single-paragraph cells"""
+    count = len(texts)
+    bolds = bolds or (False,) * count
+    aligns = aligns or (None,) * count
+    shd = f'<w:shd w:fill="{shade}"/>' if shade else ""
+    cells = "".join(
+        f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{width}"/>{shd}</w:tcPr>'
+        f'{_paragraph_xml(text, bold, align, color)}</w:tc>'
+        for text, width, bold, align in zip(texts, widths, bolds, aligns)
+    )
+    return f"<w:tr>{cells}</w:tr>"
+
+def _format_number(value, fmt):
+    """Format numbers with fmt; pass anything else through as text"""
+    if isinstance(value, (int, float)):
+        return fmt.format(value)
+    return str(value) if value is not None else ""
+
+def _render_line_items_tbl_xml(line_items, totals):
+    """Build the complete Services & Parts <w:tbl> as a single XML string
+    
+    Header row, one zebra-striped row per line item, then a row per
+    (label, amount) pair in totals. User-supplied text is escaped.
+    """
+    widths = [Inches(width).twips for width in LINE_ITEMS_TABLE_WIDTHS]
+    grid = "".join(f'<w:gridCol w:w="{width}"/>' for width in widths)
+    numeric_aligns = (None, None, "right", "right", "right")
+    
+    # Header row: bold white text on dark blue
+    headers = ("Description", "Type", "Quantity", "Price", "Total")
+    rows = [
+        _row_xml(
+            headers,
+            widths,
+            bolds=(True,) * 5,
+            aligns=("center",) * 5,
+            shade=HEADER_COLOR,
+            color=HEADER_TEXT_COLOR,
+        )
+    ]
+    
+    # Format every line item up front, reading each field once
+    cleaned = [
+        (
+            item.get('description', ''),
+            str(item.get('type') or '').capitalize(),
+            _format_number(item.get('quantity'), "{:.1f}"),
+            _format_number(item.get('unit_price'), "${:.2f}"),
+            _format_number(item.get('total'), "${:.2f}"),
+        )
+        for item in line_items
+    ]
+    
+    # Add line items
+    for i, texts in enumerate(cleaned):
+        rows.append(_row_xml(
+            texts,
+            widths,
+            aligns=numeric_aligns,
+            # Zebra striping for rows
+            shade=ZEBRA_COLOR if i % 2 == 0 else None,
+        ))
+    
+    # Totals rows: parts, labor, grand total
+    for label, amount in totals:
+        rows.append(_row_xml(
+            ("", "", "", label, _format_number(amount, "${:.2f}")),
+            widths,
+            bolds=(False, False, False, True, True),
+            aligns=(None, None, None, "right", "right"),
+        ))
+    
+    return (
+        f'<w:tbl {_NSDECLS_W}>'
+        '<w:tblPr><w:tblStyle w:val="TableGrid"/><w:tblW w:type="auto" w:w="0"/>'
+        '<w:tblLayout w:type="fixed"/>'
+        '<w:tblLook w:firstColumn="1" w:firstRow="1" w:lastColumn="0" w:lastRow="0" w:noHBand="0" w:noVBand="1" w:val="04A0"/>'
+        f'</w:tblPr><w:tblGrid>{grid}</w:tblGrid>'
+        f'{"".join(rows)}</w:tbl>'
+    )
+
+def set_table_column_widths(table, widths):
+    """Set column widths (in inches) once on the table grid
+    
+    Rewrites the w:gridCol entries and switches the table to a fixed layout,
+    which Word lays out from the grid, instead of setting the width of every
+    cell in every column. Only the first row's cells get an explicit width.
+    """
+    grid = table._tbl.tblGrid
+    for grid_col in grid.gridCol_lst:
+        grid.remove(grid_col)
+    for width in widths:
+        grid.add_gridCol().w = Inches(width)
+    
+    # Fixed layout: <w:tblLayout w:type="fixed"/>
+    table.autofit = False
+    for tc, width in zip(table._tbl.tr_lst[0].tc_lst, widths):
+        tc.width = Inches(width)
+
+def _add_label_table(doc, labels):
+    """Add a two-column table with bold labels in the first column"""
+    table = doc.add_table(rows=len(labels), cols=2)
+    table.style = 'Table Grid'
+    
+    set_table_column_widths(table, LABEL_TABLE_WIDTHS)
+    
+    for row, label in zip(table.rows, labels):
+        row.cells[0].text = label
+        row.cells[0].paragraphs[0].runs[0].bold = True
+    return table
+
+def _build_template():
+    """Build the static part of every invoice once and return it as DOCX bytes
+    
+    The skeleton holds the company header, the section headings and the
+    labelled customer/vehicle tables; only the values are filled in per call.
+    """
+    doc = Document()
+    doc.core_properties.author = COMPANY_NAME
+    
+    # ----- HEADER SECTION -----
+    # Create header table for company info and logo
+    header_table = doc.add_table(rows=1, cols=2)
+    header_table.style = 'Table Grid'
+    set_table_column_widths(header_table, HEADER_TABLE_WIDTHS)
+        
+    # Left cell: Company info
+    company_cell = header_table.cell(0, 0)
+    company_info = company_cell.paragraphs[0]
+    company_info.alignment = WD_ALIGN_PARAGRAPH.LEFT
+    
+    # Add company name with bold formatting
+    company_name_run = company_info.add_run(COMPANY_NAME)
+    company_name_run.bold = True
+    company_name_run.font.size = Pt(14)
+    company_info.add_run("\n" + COMPANY_ADDRESS)
+    company_info.add_run("\nPhone: " + COMPANY_PHONE)
+    company_info.add_run("\nEmail: " + COMPANY_EMAIL)
+    if COMPANY_WEBSITE:
+        company_info.add_run("\nWeb: " + COMPANY_WEBSITE)
+        
+    # Right cell: Document info, filled in per invoice
+    header_table.cell(0, 1).paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
+    
+    # Add some space after header
+    doc.add_paragraph()
+    
+    # ----- CUSTOMER AND VEHICLE INFO -----
+    doc.add_heading("Customer Information", level=2)
+    _add_label_table(doc, CUSTOMER_LABELS)
+    doc.add_paragraph()
+    
+    doc.add_heading("Vehicle Information", level=2)
+    _add_label_table(doc, VEHICLE_LABELS)
+    doc.add_paragraph()
+    
+    buf = BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+_TEMPLATE_BYTES = _build_template()
 
-# Helper function to set cell background color
-def set_cell_background(cell, color):
-    """Set the background color of a table cell"""
-    shading_elm = parse_xml(f'<w:shd {nsdecls("w")} w:fill="{color}"/>')
-    cell._tc.get_or_add_tcPr().append(shading_elm)
+def _build_header_xml(document_type, work_order, now):
+    """Build the document info paragraph for the right-hand header cell"""
+    title = escape(f"{document_type.upper()} #{work_order.id[:8]}")
+    status = escape(work_order.status.upper())
+    return (
+        f'<w:p {_NSDECLS_W}><w:pPr><w:jc w:val="right"/></w:pPr>'
+        f'<w:r><w:rPr><w:b/><w:sz w:val="28"/></w:rPr><w:t xml:space="preserve">{title}</w:t></w:r>'
+        f'<w:r><w:br/><w:t xml:space="preserve">Date: {now.strftime("%m/%d/%Y")}</w:t></w:r>'
+        f'<w:r><w:br/><w:t xml:space="preserve">Status: {status}</w:t></w:r>'
+        '</w:p>'
+    )
+
+def _build_cust_veh_xml(work_order, customer, vehicle):
+    """Build the value paragraphs for the customer and vehicle tables
+    
+    Returns a <w:tc> wrapper holding one paragraph per customer label
+    followed by one per vehicle label.
+    """
+    if customer:
+        customer_values = (
+            f"{customer.first_name} {customer.last_name}",
+            customer.phone,
+            customer.email,
+            customer.address if customer.address else "",
+        )
+    else:
+        customer_values = (work_order.customer_name or "Unknown", "N/A", "N/A", "N/A")
+    
+    # Prepare vehicle info
+    if vehicle:
+        vehicle_year = vehicle.year if vehicle.year else "Unknown"
+        vehicle_make = vehicle.make if vehicle.make else "Unknown"
+        vehicle_model = vehicle.model if vehicle.model else "Unknown"
+        vehicle_values = (
+            f"{vehicle_year} {vehicle_make} {vehicle_model}",
+            vehicle.vin if vehicle.vin else "Unknown",
+            f"{vehicle.mileage:,}" if vehicle.mileage else "Unknown",
+        )
+    else:
+        # Use vehicle_info from work_order if available
+        vi = work_order.vehicle_info or {}
+        vehicle_values = (
+            f"{vi.get('year', 'Unknown')} {vi.get('make', 'Unknown')} {vi.get('model', 'Unknown')}",
+            vi.get('vin', 'Unknown'),
+            f"{vi.get('mileage', 'Unknown'):,}" if vi.get('mileage') else "Unknown",
+        )
+    
+    paragraphs = "".join(_paragraph_xml(value) for value in customer_values + vehicle_values)
+    return f'<w:tc {_NSDECLS_W}>{paragraphs}</w:tc>'
 
 async def generate_invoice_docx(work_order, customer=None, vehicle=None, is_estimate=False):
     """Generate an editable Word document invoice
     
+    Building, assembly and the disk write are synchronous and run in a
+    single worker thread to keep the event loop free.
+    
     Args:
         work_order: WorkOrder database object
         customer: Customer database object (optional)
@@ -42,303 +281,84 @@ async def generate_invoice_docx(work_order, customer=None, vehicle=None, is_esti
         str: Path to the generated DOCX file
     """
     try:
-        # Set up file path and document type
-        document_type = "Estimate" if is_estimate else "Invoice"
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        unique_id = str(uuid.uuid4())[:8]
-        filename = f"{document_type}_{work_order.id[:8]}_{timestamp}.docx"
-        file_path = os.path.join(INVOICE_DIR, filename)
-        
-        # Create a new Document
-        doc = Document()
-        
-        # Set document properties
-        doc.core_properties.title = f"{document_type} #{work_order.id[:8]}"
-        doc.core_properties.author = COMPANY_NAME
-        
-        # ----- HEADER SECTION -----
-        # Create header table for company info and logo
-        header_table = doc.add_table(rows=1, cols=2)
-        header_table.style = 'Table Grid'
-        header_table.autofit = False
-        header_table.allow_autofit = False
-        
-        # Set column widths
-        for cell in header_table.columns[0].cells:
-            cell.width = Inches(4.0)
-        for cell in header_table.columns[1].cells:
-            cell.width = Inches(2.5)
-            
-        # Left cell: Company info
-        company_cell = header_table.cell(0, 0)
-        company_info = company_cell.paragraphs[0]
-        company_info.alignment = WD_ALIGN_PARAGRAPH.LEFT
-        
-        # Add company name with bold formatting
-        company_name_run = company_info.add_run(COMPANY_NAME)
-        company_name_run.bold = True
-        company_name_run.font.size = Pt(14)
-        company_info.add_run("\n" + COMPANY_ADDRESS)
-        company_info.add_run("\nPhone: " + COMPANY_PHONE)
-        company_info.add_run("\nEmail: " + COMPANY_EMAIL)
-        if COMPANY_WEBSITE:
-            company_info.add_run("\nWeb: " + COMPANY_WEBSITE)
-            
-        # Right cell: Document info
-        doc_cell = header_table.cell(0, 1)
-        doc_info = doc_cell.paragraphs[0]
-        doc_info.alignment = WD_ALIGN_PARAGRAPH.RIGHT
-        
-        # Add document title with bold formatting
-        doc_title_run = doc_info.add_run(f"{document_type.upper()} #{work_order.id[:8]}")
-        doc_title_run.bold = True
-        doc_title_run.font.size = Pt(14)
-        doc_info.add_run(f"\nDate: {datetime.now().strftime('%m/%d/%Y')}")
-        doc_info.add_run(f"\nStatus: {work_order.status.upper()}")
-        
-        # Add some space after header
-        doc.add_paragraph()
-        
-        # ----- CUSTOMER AND VEHICLE INFO -----
-        # Customer information section
-        customer_heading = doc.add_heading("Customer Information", level=2)
-        
-        # Create a table for customer info
-        customer_table = doc.add_table(rows=4, cols=2)
-        customer_table.style = 'Table Grid'
-        
-        # Set column widths
-        for cell in customer_table.columns[0].cells:
-            cell.width = Inches(1.5)
-        
-        # Add customer data
-        rows = customer_table.rows
-        
-        # Set header row
-        header_row = rows[0]
-        header_row.cells[0].text = "Customer:"
-        header_row.cells[0].paragraphs[0].runs[0].bold = True
-        
-        if customer:
-            header_row.cells[1].text = f"{customer.first_name} {customer.last_name}"
-            rows[1].cells[0].text = "Phone:"
-            rows[1].cells[0].paragraphs[0].runs[0].bold = True
-            rows[1].cells[1].text = customer.phone
-            
-            rows[2].cells[0].text = "Email:"
-            rows[2].cells[0].paragraphs[0].runs[0].bold = True
-            rows[2].cells[1].text = customer.email
-            
-            rows[3].cells[0].text = "Address:"
-            rows[3].cells[0].paragraphs[0].runs[0].bold = True
-            rows[3].cells[1].text = customer.address if customer.address else ""
-        else:
-            header_row.cells[1].text = work_order.customer_name or "Unknown"
-            rows[1].cells[0].text = "Phone:"
-            rows[1].cells[0].paragraphs[0].runs[0].bold = True
-            rows[1].cells[1].text = "N/A"
-            
-            rows[2].cells[0].text = "Email:"
-            rows[2].cells[0].paragraphs[0].runs[0].bold = True
-            rows[2].cells[1].text = "N/A"
-            
-            rows[3].cells[0].text = "Address:"
-            rows[3].cells[0].paragraphs[0].runs[0].bold = True
-            rows[3].cells[1].text = "N/A"
-        
-        # Add some space
-        doc.add_paragraph()
-        
-        # Vehicle information section
-        vehicle_heading = doc.add_heading("Vehicle Information", level=2)
-        
-        # Create a table for vehicle info
-        vehicle_table = doc.add_table(rows=3, cols=2)
-        vehicle_table.style = 'Table Grid'
-        
-        # Set column widths
-        for cell in vehicle_table.columns[0].cells:
-            cell.width = Inches(1.5)
-        
-        # Add vehicle data
-        rows = vehicle_table.rows
-        
-        # Prepare vehicle info
-        if vehicle:
-            vehicle_year = vehicle.year if vehicle.year else "Unknown"
-            vehicle_make = vehicle.make if vehicle.make else "Unknown"
-            vehicle_model = vehicle.model if vehicle.model else "Unknown"
-            
-            rows[0].cells[0].text = "Year/Make/Model:"
-            rows[0].cells[0].paragraphs[0].runs[0].bold = True
-            rows[0].cells[1].text = f"{vehicle_year} {vehicle_make} {vehicle_model}"
-            
-            rows[1].cells[0].text = "VIN:"
-            rows[1].cells[0].paragraphs[0].runs[0].bold = True
-            rows[1].cells[1].text = vehicle.vin if vehicle.vin else "Unknown"
-            
-            rows[2].cells[0].text = "Mileage:"
-            rows[2].cells[0].paragraphs[0].runs[0].bold = True
-            rows[2].cells[1].text = f"{vehicle.mileage:,}" if vehicle.mileage else "Unknown"
-        else:
-            # Use vehicle_info from work_order if available
-            vi = work_order.vehicle_info or {}
-            
-            rows[0].cells[0].text = "Year/Make/Model:"
-            rows[0].cells[0].paragraphs[0].runs[0].bold = True
-            rows[0].cells[1].text = f"{vi.get('year', 'Unknown')} {vi.get('make', 'Unknown')} {vi.get('model', 'Unknown')}"
-            
-            rows[1].cells[0].text = "VIN:"
-            rows[1].cells[0].paragraphs[0].runs[0].bold = True
-            rows[1].cells[1].text = vi.get('vin', 'Unknown')
-            
-            rows[2].cells[0].text = "Mileage:"
-            rows[2].cells[0].paragraphs[0].runs[0].bold = True
-            rows[2].cells[1].text = f"{vi.get('mileage', 'Unknown'):,}" if vi.get('mileage') else "Unknown"
-        
-        # Add some space
-        doc.add_paragraph()
-        
-        # ----- WORK SUMMARY -----
-        doc.add_heading("Work Summary", level=2)
-        doc.add_paragraph(work_order.work_summary)
-        
-        # Add some space
-        doc.add_paragraph()
-        
-        # ----- LINE ITEMS TABLE -----
-        doc.add_heading("Services & Parts", level=2)
-        
-        # Create table for line items
-        line_items = work_order.line_items or []
-        # Add 4 rows: header + items + totals (parts, labor, grand total)
-        table_rows = len(line_items) + 4
-        line_items_table = doc.add_table(rows=table_rows, cols=5)
-        line_items_table.style = 'Table Grid'
-        line_items_table.autofit = False
-        
-        # Set column widths
-        col_widths = [3.5, 1.0, 1.0, 1.0, 1.0]  # in inches
-        for i, width in enumerate(col_widths):
-            for cell in line_items_table.columns[i].cells:
-                cell.width = Inches(width)
-        
-        # Header row
-        header_row = line_items_table.rows[0]
-        headers = ["Description", "Type", "Quantity", "Price", "Total"]
-        
-        for i, header_text in enumerate(headers):
-            cell = header_row.cells[i]
-            cell.text = header_text
-            cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-            cell.paragraphs[0].runs[0].bold = True
-            # Dark blue background for header
-            set_cell_background(cell, "3B71CA")  # Dark blue
-            # White text for header
-            for run in cell.paragraphs[0].runs:
-                run.font.color.rgb = RGBColor(255, 255, 255)
-        
-        # Add line items
-        for i, item in enumerate(line_items):
-            row = line_items_table.rows[i + 1]
-            
-            # Description
-            row.cells[0].text = item.get('description', '')
-            
-            # Type
-            row.cells[1].text = item.get('type', '').capitalize()
-            
-            # Quantity
-            quantity = f"{item.get('quantity', 0):.1f}" if isinstance(item.get('quantity'), (int, float)) else str(item.get('quantity', ''))
-            row.cells[2].text = quantity
-            row.cells[2].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
-            
-            # Unit Price
-            unit_price = f"${item.get('unit_price', 0):.2f}" if isinstance(item.get('unit_price'), (int, float)) else str(item.get('unit_price', ''))
-            row.cells[3].text = unit_price
-            row.cells[3].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
-            
-            # Total
-            total = f"${item.get('total', 0):.2f}" if isinstance(item.get('total'), (int, float)) else str(item.get('total', ''))
-            row.cells[4].text = total
-            row.cells[4].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
-            
-            # Zebra striping for rows
-            if i % 2 == 0:
-                for cell in row.cells:
-                    set_cell_background(cell, "F5F5F5")  # Light gray
-        
-        # Calculate the row index for totals
-        totals_start_idx = len(line_items) + 1
-        
-        # Parts Total
-        parts_row = line_items_table.rows[totals_start_idx]
-        parts_row.cells[0].text = ""
-        parts_row.cells[1].text = ""
-        parts_row.cells[2].text = ""
-        parts_row.cells[3].text = "Parts Total:"
-        parts_row.cells[3].paragraphs[0].runs[0].bold = True
-        parts_row.cells[3].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
-        parts_total = f"${work_order.total_parts:.2f}" if isinstance(work_order.total_parts, (int, float)) else str(work_order.total_parts)
-        parts_row.cells[4].text = parts_total
-        parts_row.cells[4].paragraphs[0].runs[0].bold = True
-        parts_row.cells[4].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
-        
-        # Labor Total
-        labor_row = line_items_table.rows[totals_start_idx + 1]
-        labor_row.cells[0].text = ""
-        labor_row.cells[1].text = ""
-        labor_row.cells[2].text = ""
-        labor_row.cells[3].text = "Labor Total:"
-        labor_row.cells[3].paragraphs[0].runs[0].bold = True
-        labor_row.cells[3].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
-        labor_total = f"${work_order.total_labor:.2f}" if isinstance(work_order.total_labor, (int, float)) else str(work_order.total_labor)
-        labor_row.cells[4].text = labor_total
-        labor_row.cells[4].paragraphs[0].runs[0].bold = True
-        labor_row.cells[4].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
-        
-        # Grand Total
-        grand_row = line_items_table.rows[totals_start_idx + 2]
-        grand_row.cells[0].text = ""
-        grand_row.cells[1].text = ""
-        grand_row.cells[2].text = ""
-        grand_row.cells[3].text = "GRAND TOTAL:"
-        grand_row.cells[3].paragraphs[0].runs[0].bold = True
-        grand_row.cells[3].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
-        grand_total = f"${work_order.total:.2f}" if isinstance(work_order.total, (int, float)) else str(work_order.total)
-        grand_row.cells[4].text = grand_total
-        grand_row.cells[4].paragraphs[0].runs[0].bold = True
-        grand_row.cells[4].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
-        
-        # Add some space
-        doc.add_paragraph()
-        
-        # ----- NOTES SECTION -----
-        if is_estimate:
-            note_para = doc.add_paragraph()
-            note_run = note_para.add_run("PLEASE NOTE: This is an ESTIMATE only. Actual charges may vary based on additional parts or labor required. This estimate is valid for 30 days.")
-            note_run.bold = True
-        else:
-            # Payment terms
-            terms_para = doc.add_paragraph()
-            terms_run = terms_para.add_run("PAYMENT TERMS: Payment due upon completion of service. We accept cash, checks, and all major credit cards.")
-            terms_run.bold = True
-        
-        # Thank you message
-        thanks_para = doc.add_paragraph()
-        thanks_para.add_run("Thank you for your business!")
-        
-        # ----- FOOTER -----
-        footer_para = doc.add_paragraph()
-        footer_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        footer_para.add_run(f"{COMPANY_NAME} • {COMPANY_PHONE} • {COMPANY_EMAIL}")
-        
-        # Save the document
-        doc.save(file_path)
-        return file_path
+        return await asyncio.to_thread(
+            _build_invoice_docx, work_order, customer, vehicle, is_estimate
+        )
         
     except Exception as e:
         print(f"Error generating DOCX: {e}")
         import traceback
         traceback.print_exc()
         return None
+
+def _build_invoice_docx(work_order, customer, vehicle, is_estimate):
+    """Build the invoice sections, insert them into the skeleton and save it (blocking)"""
+    document_type = "Estimate" if is_estimate else "Invoice"
+    now = datetime.now()
+    totals = (
+        ("Parts Total:", work_order.total_parts),
+        ("Labor Total:", work_order.total_labor),
+        ("GRAND TOTAL:", work_order.total),
+    )
+    header_p = parse_xml(_build_header_xml(document_type, work_order, now))
+    cust_veh_tc = parse_xml(_build_cust_veh_xml(work_order, customer, vehicle))
+    line_items_tbl = parse_xml(_render_line_items_tbl_xml(work_order.line_items or [], totals))
+    
+    # Set up file path
+    timestamp = now.strftime("%Y%m%d%H%M%S")
+    filename = f"{document_type}_{work_order.id[:8]}_{timestamp}.docx"
+    file_path = _INVOICE_DIR_PATH / filename
+    
+    # Start from the pre-built skeleton
+    doc = Document(BytesIO(_TEMPLATE_BYTES))
+    header_table, customer_table, vehicle_table = doc.tables
+    
+    # Set document properties
+    doc.core_properties.title = f"{document_type} #{work_order.id[:8]}"
+    
+    # ----- HEADER SECTION -----
+    doc_info_tc = header_table._tbl.tr_lst[0].tc_lst[1]
+    doc_info_tc.replace(doc_info_tc.p_lst[0], header_p)
+    
+    # ----- CUSTOMER AND VEHICLE INFO -----
+    value_tcs = [tr.tc_lst[1] for tr in customer_table._tbl.tr_lst + vehicle_table._tbl.tr_lst]
+    for tc, paragraph in zip(value_tcs, list(cust_veh_tc)):
+        tc.replace(tc.p_lst[0], paragraph)
+    
+    # ----- WORK SUMMARY -----
+    doc.add_heading("Work Summary", level=2)
+    doc.add_paragraph(work_order.work_summary)
+    
+    # Add some space
+    doc.add_paragraph()
+    
+    # ----- LINE ITEMS TABLE -----
+    doc.add_heading("Services & Parts", level=2)
+    doc.element.body.insert_element_before(line_items_tbl, "w:sectPr")
+    
+    # Add some space
+    doc.add_paragraph()
+    
+    # ----- NOTES SECTION -----
+    if is_estimate:
+        note_para = doc.add_paragraph()
+        note_run = note_para.add_run("PLEASE NOTE: This is an ESTIMATE only. Actual charges may vary based on additional parts or labor required. This estimate is valid for 30 days.")
+        note_run.bold = True
+    else:
+        # Payment terms
+        terms_para = doc.add_paragraph()
+        terms_run = terms_para.add_run("PAYMENT TERMS: Payment due upon completion of service. We accept cash, checks, and all major credit cards.")
+        terms_run.bold = True
+    
+    # Thank you message
+    thanks_para = doc.add_paragraph()
+    thanks_para.add_run("Thank you for your business!")
+    
+    # ----- FOOTER -----
+    footer_para = doc.add_paragraph()
+    footer_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    footer_para.add_run(f"{COMPANY_NAME} • {COMPANY_PHONE} • {COMPANY_EMAIL}")
+    
+    # Save the document
+    doc.save(file_path)
+    return str(file_path)
@@ -1,96 +1,170 @@
-import httpx
-import json
 import os
-from dotenv import load_dotenv, dotenv_values
 
-load_dotenv()
+import httpx
+import json_repair
+import orjson
+
+from services.http_client import get_openai_client
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")
+LABOR_RATE = float(os.getenv("LABOR_RATE_PER_HOUR", "50"))
+
+# Static instructions and the response schema go in the system message so the
+# request prefix is identical across calls and eligible for prompt caching.
+SYSTEM_PROMPT = f"""You are an expert auto repair service writer who converts technician voice memos into professional work orders.
+- Summarize the work performed. If the memo says this is an estimate, describe it as work to be performed.
+- List parts used with prices.
+- Estimate labor hours and cost at ${LABOR_RATE:g}/hour.
+- Give a total.
+- Outline any recommendations for the customer to address later.
+- Aim for about 400 words. Don't repeat vehicle details like VIN or year/make/model in the summary.
+Reply with a JSON object:
+{{"work_summary": string, "line_items": [{{"description": string, "type": "part"|"labor", "quantity": number, "unit_price": number, "total": number}}], "total_parts": number, "total_labor": number, "total": number}}"""
+
+PROMPT_TEMPLATE = """{vehicle_context}
+Voice memo transcript:
+{transcript}"""
+
+
+def _build_payload(transcript, vehicle_info):
+    vehicle_context = ""
+    if vehicle_info:
+        vehicle_context = f"Vehicle information: VIN {vehicle_info.get('vin', 'unknown')}, Mileage: {vehicle_info.get('mileage', 'unknown')}"
+
+    prompt = PROMPT_TEMPLATE.format(
+        vehicle_context=vehicle_context,
+        transcript=transcript,
+    )
+
+    return {
+        "model": MODEL,
+        "messages": [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt},
+        ],
+        "temperature": 0.1,
+        "response_format": {"type": "json_object"},
+        "stream": True,
+    }
+
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+def _extract_json_object(text):
+    """Return the longest balanced {...} substring of text, or None"""
+    best = None
+    depth = 0
+    start = None
+    in_string = False
+    escaped = False
+    for i, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            if depth == 0:
+                start = i
+            depth += 1
+        elif char == "}" and depth > 0:
+            depth -= 1
+            if depth == 0 and (best is None or i + 1 - start > len(best)):
+                best = text[start : i + 1]
+    return best
+
+
+def _parse_summary_json(result):
+    """Parse the model's JSON output, repairing common LLM JSON mistakes
+
+    Falls back to json_repair (trailing commas, unclosed braces, smart
+    quotes, ...) and then to the longest balanced {...} block in the text.
+    Returns None if nothing usable can be recovered.
+    """
+    try:
+        return orjson.loads(result)
+    except orjson.JSONDecodeError:
+        pass
+
+    repaired = json_repair.loads(result)
+    if isinstance(repaired, dict) and repaired:
+        return repaired
+
+    candidate = _extract_json_object(result)
+    if candidate:
+        try:
+            return orjson.loads(candidate)
+        except orjson.JSONDecodeError:
+            repaired = json_repair.loads(candidate)
+            if isinstance(repaired, dict) and repaired:
+                return repaired
+    return None
+
+
+async def stream_work_summary(transcript, vehicle_info):
+    """Yield the work summary JSON text in chunks as the model generates it
+
+    Raises httpx.HTTPStatusError if the API rejects the request.
+    """
+    payload = _build_payload(transcript, vehicle_info)
+    async with get_openai_client().stream(
+        "POST",
+        "/chat/completions",
+        content=orjson.dumps(payload),
+        headers=JSON_HEADERS,
+        timeout=30.0,
+    ) as response:
+        if response.status_code != 200:
+            await response.aread()
+            response.raise_for_status()
+
+        # Server-sent events: one "data: {...}" line per chunk
+        async for line in response.aiter_lines():
+            if not line.startswith("data: "):
+                continue
+            data = line[len("data: ") :]
+            if data == "[DONE]":
+                break
+            choices = orjson.loads(data)["choices"]
+            if choices:
+                content = choices[0]["delta"].get("content")
+                if content:
+                    yield content
 
 
 async def generate_work_summary(transcript, vehicle_info):
     """Generate a structured work summary from the transcript"""
     try:
-        async with httpx.AsyncClient() as client:
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {OPENAI_API_KEY}",
+        try:
+            chunks = [
+                chunk async for chunk in stream_work_summary(transcript, vehicle_info)
+            ]
+        except httpx.HTTPStatusError as e:
+            print(f"OpenAI API error: {e.response.text}")
+            return {
+                "work_summary": "Error generating work summary",
+                "line_items": [],
+                "total_parts": 0,
+                "total_labor": 0,
+                "total": 0,
             }
 
-            vehicle_context = ""
-            if vehicle_info:
-                vehicle_context = f"Vehicle information: VIN {vehicle_info.get('vin', 'unknown')}, Mileage: {vehicle_info.get('mileage', 'unknown')}"
-
-            prompt = f"""
-            Based on the following voice memo transcript from an auto technician, create:
-            1. A summary of work performed
-                * Note: if the audio mentions that this is an estimate, make sure to note that this isn't actually work performed, but work that needs to be performed.
-            2. A detailed list of parts used with prices
-            3. An estimate of labor hours and cost (assume $50/hour)
-            4. A total estimate
-            5. If there are recommendations made to the customer to take later, outline these because this is where the customer will read them.
-            6. Shoot for 400 words
-            7. Don't repeat vehicle information in the summary like VIN or YMM.
-            
-            {vehicle_context}
-            
-            Voice memo transcript:
-            {transcript}
-            
-            Format the response as JSON with these fields:
-            {{
-                "work_summary": "Brief description of work done",
-                "line_items": [
-                    {{"description": "Part or labor description", "type": "part|labor", "quantity": number, "unit_price": number, "total": number}}
-                ],
-                "total_parts": number,
-                "total_labor": number,
-                "total": number
-            }}
-            """
-
-            payload = {
-                "model": "gpt-4o",
-                "messages": [
-                    {
-                        "role": "system",
-                        "content": "You are an expert auto repair service writer who converts technician notes into professional work orders.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                "temperature": 0.1,
-                "response_format": {"type": "json_object"},
+        result = "".join(chunks)
+        summary = _parse_summary_json(result)
+        if summary is None:
+            print(f"Failed to parse JSON from response: {result}")
+            return {
+                "work_summary": "Error parsing work summary",
+                "line_items": [],
+                "total_parts": 0,
+                "total_labor": 0,
+                "total": 0,
             }
-
-            response = await client.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=30.0,
-            )
-
-            if response.status_code == 200:
-                result = response.json()["choices"][0]["message"]["content"]
-                try:
-                    return json.loads(result)
-                except json.JSONDecodeError:
-                    print(f"Failed to parse JSON from response: {result}")
-                    return {
-                        "work_summary": "Error parsing work summary",
-                        "line_items": [],
-                        "total_parts": 0,
-                        "total_labor": 0,
-                        "total": 0,
-                    }
-            else:
-                print(f"OpenAI API error: {response.text}")
-                return {
-                    "work_summary": "Error generating work summary",
-                    "line_items": [],
-                    "total_parts": 0,
-                    "total_labor": 0,
-                    "total": 0,
-                }
+        return summary
     except Exception as e:
         print(f"Error generating work summary: {e}")
         return {
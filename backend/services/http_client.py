@@ -0,0 +1,67 @@
+import logging
+import os
+from typing import Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+OPENAI_BASE_URL = "https://api.openai.com/v1"
+NHTSA_BASE_URL = "https://vpic.nhtsa.dot.gov/api/vehicles"
+
+_openai_client: Optional[httpx.AsyncClient] = None
+_nhtsa_client: Optional[httpx.AsyncClient] = None
+
+
+async def _log_response(response: httpx.Response):
+    logger.debug(
+        "%s %s -> %s over %s",
+        response.request.method,
+        response.request.url.path,
+        response.status_code,
+        response.http_version,
+    )
+
+
+def get_openai_client() -> httpx.AsyncClient:
+    """Get the shared OpenAI HTTP client, creating it on first use
+
+    Reusing one client keeps the TLS connection to api.openai.com warm and
+    lets concurrent requests multiplex over it with HTTP/2.
+    """
+    global _openai_client
+    if _openai_client is None:
+        _openai_client = httpx.AsyncClient(
+            base_url=OPENAI_BASE_URL,
+            http2=True,
+            timeout=60.0,
+            limits=httpx.Limits(max_keepalive_connections=50),
+            headers={"Authorization": f"Bearer {os.getenv('OPENAI_API_KEY')}"},
+            event_hooks={"response": [_log_response]},
+        )
+    return _openai_client
+
+
+def get_nhtsa_client() -> httpx.AsyncClient:
+    """Get the shared NHTSA vPIC HTTP client, creating it on first use"""
+    global _nhtsa_client
+    if _nhtsa_client is None:
+        _nhtsa_client = httpx.AsyncClient(
+            base_url=NHTSA_BASE_URL,
+            http2=True,
+            timeout=10.0,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+            event_hooks={"response": [_log_response]},
+        )
+    return _nhtsa_client
+
+
+async def close_clients():
+    """Close the shared HTTP clients"""
+    global _openai_client, _nhtsa_client
+    if _openai_client is not None:
+        await _openai_client.aclose()
+        _openai_client = None
+    if _nhtsa_client is not None:
+        await _nhtsa_client.aclose()
+        _nhtsa_client = None
@@ -1,276 +1,469 @@
-import httpx
-import json
+import logging
+import mmap
 import os
 import base64
 import asyncio
-from dotenv import load_dotenv, dotenv_values
+import re
+from io import BytesIO
+from urllib.parse import quote
+
+import httpx
+import orjson
+from PIL import Image, ImageOps, UnidentifiedImageError
+from tenacity import (
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_exponential,
+)
+
+from services.http_client import get_openai_client
+
+logger = logging.getLogger(__name__)
+
+# Typical VIN is 17 alphanumeric characters (I, O and Q are never used)
+_VIN_RE = re.compile(r"[A-HJ-NPR-Z0-9]{17}")
+_VIN_CHARS = b"ABCDEFGHJKLMNPRSTUVWXYZ0123456789"
+_MILEAGE_RE = re.compile(r"[0-9,]+")
+
+# GPT-4o downsamples images itself; larger photos are shrunk before upload
+MAX_IMAGE_EDGE = int(os.getenv("VISION_MAX_IMAGE_EDGE", "1024"))
+JPEG_QUALITY = 85
+
+# If uploaded images are also served over HTTPS (e.g. a bucket or static host
+# mirroring UPLOAD_DIR/images), OpenAI can fetch them from there by URL
+VISION_IMAGE_BASE_URL = os.getenv("VISION_IMAGE_BASE_URL", "").rstrip("/")
+
+# "openai" reads odometers and plates with GPT-4o; "local" tries EasyOCR on
+# this host first and only calls the API when it isn't confident enough
+OCR_BACKEND = os.getenv("OCR_BACKEND", "openai")
+OCR_MIN_CONFIDENCE = float(os.getenv("OCR_MIN_CONFIDENCE", "0.6"))
+_OCR_ALLOWLISTS = {
+    "odometer": "0123456789,",
+    "plate": "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789",
+}
+
+ocr_reader = None
+if OCR_BACKEND == "local":
+    # Optional dependency, only needed for local OCR
+    import easyocr
+
+    ocr_reader = easyocr.Reader(["en"], gpu=False)
+
+# Marks a local OCR result that hasn't been computed yet (None means it ran
+# and found nothing usable)
+_NOT_READ = object()
+
+# Responses worth retrying: rate limiting and server-side errors
+_RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Read size for base64 encoding; a multiple of 3 so chunks concatenate cleanly
+_B64_CHUNK_SIZE = 3 * 64 * 1024
+
+
+def _vision_payload(template, image_url):
+    """Build a Vision API payload from one of the templates below
+
+    The model settings and prompt part are shared with the template; only
+    the message list holding the image URL is new per call.
+    """
+    payload = dict(template)
+    payload["messages"] = [
+        {
+            "role": "user",
+            "content": [
+                template["messages"][0]["content"][0],
+                {"type": "image_url", "image_url": {"url": image_url}},
+            ],
+        }
+    ]
+    return payload
+
+
+def _payload_template(prompt, **settings):
+    """Build the static part of a single-image Vision API payload"""
+    return {
+        "model": "gpt-4o",
+        "messages": [{"role": "user", "content": [{"type": "text", "text": prompt}]}],
+        "temperature": 0,
+        "seed": 42,
+        **settings,
+    }
+
+
+_VIN_PAYLOAD = _payload_template(
+    "Extract the VIN number from this door placard image. Only return the VIN, nothing else.",
+    max_tokens=20,
+)
+_ODOMETER_PAYLOAD = _payload_template(
+    "Read the odometer value from this image. Return only the numeric value in miles, no text.",
+    max_tokens=15,
+)
+_PLATE_PAYLOAD = _payload_template(
+    "Extract the license plate number from this vehicle image. Only return the plate number, nothing else.",
+    max_tokens=15,
+)
+_CUSTOMER_PAYLOAD = _payload_template(
+    """
+        Extract customer information from this image (like a business card or form).
+        Return ONLY a JSON object with the following fields:
+        {
+            "first_name": "First name of the customer",
+            "last_name": "Last name of the customer",
+            "email": "Email address if visible",
+            "phone": "Phone number if visible",
+            "address": "Physical address if visible"
+        }
+        
+        If any field is not visible or unclear, leave it as an empty string.
+        """,
+    max_tokens=200,
+    response_format={"type": "json_object"},
+)
 
-load_dotenv()
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-VISION_API_KEY = os.getenv("OPENAI_API_KEY")
+async def image_url_for(path):
+    """Return the URL to send to the Vision API for an uploaded image
+
+    Uses VISION_IMAGE_BASE_URL when it is set, so no image bytes go in the
+    request; otherwise the file is inlined as a data: URL, prepared in a
+    worker thread.
+    """
+    if VISION_IMAGE_BASE_URL:
+        return f"{VISION_IMAGE_BASE_URL}/{quote(os.path.basename(path))}"
+    return await asyncio.to_thread(file_to_data_url, path)
+
+
+def ocr_local(file_path, allowlist):
+    """Return the most confident (text, confidence) EasyOCR finds in an image"""
+    results = ocr_reader.readtext(file_path, allowlist=allowlist)
+    if not results:
+        return "", 0.0
+    _, text, confidence = max(results, key=lambda result: result[2])
+    return text, confidence
+
+
+async def read_local(key, file_path):
+    """Read an odometer or plate image with local OCR
+
+    Returns None when local OCR is disabled, fails, or is below
+    OCR_MIN_CONFIDENCE, so the caller should ask the Vision API instead.
+    """
+    if ocr_reader is None:
+        return None
+    try:
+        text, confidence = await asyncio.to_thread(
+            ocr_local, file_path, _OCR_ALLOWLISTS[key]
+        )
+    except Exception as e:
+        logger.warning("Local OCR failed for %s: %s", file_path, e)
+        return None
+    logger.debug("Local OCR %s: %r (confidence %.2f)", key, text, confidence)
+    if confidence < OCR_MIN_CONFIDENCE:
+        return None
+    return _validate_combined(key, text)
+
+
+def find_vin(text):
+    """Return the first valid VIN in text, or None
+
+    The model is asked for just the VIN, so the common case is a bare
+    17-character string. That is checked with a single bytes.translate call
+    (deleting every allowed character must leave nothing) before falling
+    back to scanning with the regex.
+    """
+    if len(text) == 17 and text.isascii():
+        if not text.encode("ascii").translate(None, _VIN_CHARS):
+            return text
+    vin_match = _VIN_RE.search(text)
+    return vin_match.group(0) if vin_match else None
+
+
+def prepare_image(path):
+    """Downscale a photo to MAX_IMAGE_EDGE and re-encode it as JPEG
+
+    Returns None when the image is already small enough, or when Pillow
+    can't read it, in which case the original file should be sent as is.
+    """
+    try:
+        with Image.open(path) as im:
+            if max(im.size) <= MAX_IMAGE_EDGE:
+                return None
+            im = ImageOps.exif_transpose(im)
+            im.thumbnail((MAX_IMAGE_EDGE, MAX_IMAGE_EDGE), Image.LANCZOS)
+            if im.mode != "RGB":
+                im = im.convert("RGB")
+            buf = BytesIO()
+            im.save(buf, "JPEG", quality=JPEG_QUALITY, optimize=True)
+            return buf.getvalue()
+    except (UnidentifiedImageError, OSError) as e:
+        logger.warning("Could not downscale image %s: %s", path, e)
+        return None
 
-print("Api key", OPENAI_API_KEY)
+
+def file_to_data_url(path, mime_type="image/jpeg"):
+    """Read an image file into a base64 data: URL
+
+    Large photos are downscaled first (see prepare_image). Otherwise the
+    file is memory-mapped and encoded in chunks into one preallocated
+    buffer, so the raw bytes are never copied into a Python object.
+    """
+    resized = prepare_image(path)
+    if resized is not None:
+        return "data:image/jpeg;base64," + base64.b64encode(resized).decode("ascii")
+
+    prefix = f"data:{mime_type};base64,".encode("ascii")
+    size = os.path.getsize(path)
+    buf = bytearray(len(prefix) + 4 * ((size + 2) // 3))
+    buf[: len(prefix)] = prefix
+    pos = len(prefix)
+    if size:
+        with open(path, "rb") as f, mmap.mmap(
+            f.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mm, memoryview(mm) as view:
+            for start in range(0, len(view), _B64_CHUNK_SIZE):
+                encoded = base64.b64encode(view[start : start + _B64_CHUNK_SIZE])
+                buf[pos : pos + len(encoded)] = encoded
+                pos += len(encoded)
+    return buf[:pos].decode("ascii")
+
+
+def _is_transient(error):
+    """Whether an OpenAI request error is worth retrying"""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in _RETRY_STATUS_CODES
+    return isinstance(error, httpx.TransportError)
+
+
+@retry(
+    stop=stop_after_attempt(4),
+    wait=wait_exponential(multiplier=1, min=1, max=10),
+    retry=retry_if_exception(_is_transient),
+    reraise=True,
+)
+async def _call_openai(payload):
+    """POST a chat completion and return the parsed response body
+
+    Rate limits, server errors and dropped connections are retried with
+    exponential backoff; any other error status raises straight away.
+    """
+    client = get_openai_client()
+    response = await client.post("/chat/completions", json=payload, timeout=30.0)
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
+
+def _reply_text(body):
+    return body["choices"][0]["message"]["content"]
 
 
 async def extract_vin_from_image(file_path):
     """Extract VIN from door placard image using Vision API"""
-    retry_count = 0
-    last_error = None
-    while retry_count < 3:
-        try:
-            async with httpx.AsyncClient() as client:
-                with open(file_path, "rb") as f:
-                    image_content = base64.b64encode(f.read()).decode("utf-8")
-
-                # Using OpenAI Vision for image analysis
-                headers = {
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {VISION_API_KEY}",
-                }
-                payload = {
-                    "model": "gpt-4o",
-                    "messages": [
-                        {
-                            "role": "user",
-                            "content": [
-                                {
-                                    "type": "text",
-                                    "text": "Extract the VIN number from this door placard image. Only return the VIN, nothing else.",
-                                },
-                                {
-                                    "type": "image_url",
-                                    "image_url": {
-                                        "url": f"data:image/jpeg;base64,{image_content}"
-                                    },
-                                },
-                            ],
-                        }
-                    ],
-                    "max_tokens": 100,
-                }
-                response = await client.post(
-                    "https://api.openai.com/v1/chat/completions",
-                    headers=headers,
-                    json=payload,
-                    timeout=30.0,
-                )
-
-                if response.status_code == 200:
-                    vin_text = response.json()["choices"][0]["message"][
-                        "content"
-                    ].strip()
-                    print("VIN text:", vin_text)
-                    # Typical VIN is 17 alphanumeric characters
-                    # Extract just the VIN using simple validation
-                    import re
-
-                    vin_match = re.search(r"[A-HJ-NPR-Z0-9]{17}", vin_text)
-                    print("VIN match:", vin_match)
-                    if vin_match:
-                        return vin_match.group(0)
-                    retry_count += 1
-                    if retry_count < 3:
-                        print(f"No valid VIN found, retrying... ({retry_count}/3)")
-                        await asyncio.sleep(2)
-                    continue
-                else:
-                    print(f"Vision API error: {response.text}")
-                    retry_count += 1
-                    if retry_count < 3:
-                        await asyncio.sleep(2)
-                    continue
-        except Exception as e:
-            last_error = e
-            print(f"Extraction attempt {retry_count + 1} failed: {e}")
-            retry_count += 1
-            if retry_count < 3:
+    try:
+        image_url = await image_url_for(file_path)
+        payload = _vision_payload(_VIN_PAYLOAD, image_url)
+        for attempt in range(1, 4):
+            vin_text = _reply_text(await _call_openai(payload)).strip()
+            logger.debug("VIN text: %s", vin_text)
+            vin = find_vin(vin_text)
+            logger.debug("VIN match: %s", vin)
+            if vin:
+                return vin
+            if attempt < 3:
+                logger.info("No valid VIN found, retrying... (%d/3)", attempt)
                 await asyncio.sleep(2)
-
-    print(f"VIN extraction failed after 3 attempts. Last error: {last_error}")
+        logger.error("No valid VIN found after 3 attempts")
+    except Exception as e:
+        logger.error("VIN extraction failed: %s", e)
     return ""
 
 
-async def read_odometer_image(file_path):
-    """Extract odometer reading from image using Vision API"""
+async def read_odometer_image(file_path, local_mileage=_NOT_READ):
+    """Extract odometer reading from image using local OCR or Vision API
+
+    Pass local_mileage when read_local has already run on this image (None
+    if it found nothing usable) so OCR isn't repeated.
+    """
+    if local_mileage is _NOT_READ:
+        local_mileage = await read_local("odometer", file_path)
+    if local_mileage:
+        return local_mileage
+
     try:
-        async with httpx.AsyncClient() as client:
-            with open(file_path, "rb") as f:
-                image_content = base64.b64encode(f.read()).decode("utf-8")
-
-            # Using OpenAI Vision for odometer reading
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {VISION_API_KEY}",
-            }
-            payload = {
-                "model": "gpt-4o",
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": "Read the odometer value from this image. Return only the numeric value in miles, no text.",
-                            },
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/jpeg;base64,{image_content}"
-                                },
-                            },
-                        ],
-                    }
-                ],
-                "max_tokens": 100,
-            }
-            response = await client.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=30.0,
-            )
-
-            if response.status_code == 200:
-                mileage_text = response.json()["choices"][0]["message"][
-                    "content"
-                ].strip()
-                print("Mileage text:", mileage_text)
-                # Try to extract just the number
-                import re
-
-                mileage_match = re.search(r"[0-9,]+", mileage_text)
-                print("Mileage match:", mileage_match)
-                if mileage_match:
-                    # Remove commas and convert to integer
-                    return mileage_match.group(0).replace(",", "")
-                return mileage_text
-            else:
-                print(f"Vision API error: {response.text}")
-                return ""
+        image_url = await image_url_for(file_path)
+        payload = _vision_payload(_ODOMETER_PAYLOAD, image_url)
+        mileage_text = _reply_text(await _call_openai(payload)).strip()
+        logger.debug("Mileage text: %s", mileage_text)
+        # Try to extract just the number
+        mileage_match = _MILEAGE_RE.search(mileage_text)
+        logger.debug("Mileage match: %s", mileage_match)
+        if mileage_match:
+            # Remove commas and convert to integer
+            return mileage_match.group(0).replace(",", "")
+        return mileage_text
     except Exception as e:
-        print(f"Error processing odometer image: {e}")
+        logger.error("Error processing odometer image: %s", e)
         return ""
 
 
-async def read_plate_from_image(file_path):
-    """Extract License Plate Number from image using Vision API"""
+async def read_plate_from_image(file_path, local_plate=_NOT_READ):
+    """Extract License Plate Number from image using local OCR or Vision API
+
+    local_plate works like local_mileage in read_odometer_image.
+    """
+    if local_plate is _NOT_READ:
+        local_plate = await read_local("plate", file_path)
+    if local_plate:
+        return local_plate
+
     try:
-        async with httpx.AsyncClient() as client:
-            with open(file_path, "rb") as f:
-                image_content = base64.b64encode(f.read()).decode("utf-8")
-
-            # Using OpenAI Vision for image analysis
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {VISION_API_KEY}",
-            }
-            payload = {
-                "model": "gpt-4o",
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": "Extract the license plate number from this vehicle image. Only return the plate number, nothing else.",
-                            },
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/jpeg;base64,{image_content}"
-                                },
-                            },
-                        ],
-                    }
-                ],
-                "max_tokens": 100,
-            }
-            response = await client.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=30.0,
-            )
-
-            if response.status_code == 200:
-                license_text = response.json()["choices"][0]["message"][
-                    "content"
-                ].strip()
-                print("License text:", license_text)
-                return license_text
-            else:
-                print(f"Vision API error: {response.text}")
-                return ""
+        image_url = await image_url_for(file_path)
+        payload = _vision_payload(_PLATE_PAYLOAD, image_url)
+        license_text = _reply_text(await _call_openai(payload)).strip()
+        logger.debug("License text: %s", license_text)
+        return license_text
     except Exception as e:
-        print(f"Error processing image: {e}")
+        logger.error("Error processing image: %s", e)
         return ""
 
 
 async def extract_customer_info_from_image(file_path):
     """Extract customer information from an image using Vision API"""
     try:
-        async with httpx.AsyncClient() as client:
-            with open(file_path, "rb") as f:
-                image_content = base64.b64encode(f.read()).decode("utf-8")
-
-            # Using OpenAI Vision for image analysis
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {VISION_API_KEY}",
-            }
-
-            prompt = """
-            Extract customer information from this image (like a business card or form).
-            Return ONLY a JSON object with the following fields:
-            {
-                "first_name": "First name of the customer",
-                "last_name": "Last name of the customer",
-                "email": "Email address if visible",
-                "phone": "Phone number if visible",
-                "address": "Physical address if visible"
-            }
-            
-            If any field is not visible or unclear, leave it as an empty string.
-            """
-
-            payload = {
-                "model": "gpt-4o",
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": prompt},
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/jpeg;base64,{image_content}"
-                                },
-                            },
-                        ],
-                    }
-                ],
-                "max_tokens": 300,
-                "response_format": {"type": "json_object"},
-            }
-
-            response = await client.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=30.0,
-            )
-
-            if response.status_code == 200:
-                result = response.json()["choices"][0]["message"]["content"]
-                try:
-                    return json.loads(result)
-                except json.JSONDecodeError:
-                    print(f"Failed to parse JSON from response: {result}")
-                    return None
-            else:
-                print(f"Vision API error: {response.text}")
-                return None
+        image_url = await image_url_for(file_path)
+        payload = _vision_payload(_CUSTOMER_PAYLOAD, image_url)
+        result = _reply_text(await _call_openai(payload))
     except Exception as e:
-        print(f"Error extracting customer info from image: {e}")
+        logger.error("Error extracting customer info from image: %s", e)
+        return None
+
+    try:
+        return orjson.loads(result)
+    except orjson.JSONDecodeError:
+        logger.error("Failed to parse JSON from response: %s", result)
         return None
+
+
+IMAGE_EXTRACTORS = {
+    "vin": extract_vin_from_image,
+    "odometer": read_odometer_image,
+    "plate": read_plate_from_image,
+    "customer": extract_customer_info_from_image,
+}
+
+
+async def extract_all(paths, ocr_results=None):
+    """Run the extractors for several images concurrently
+
+    paths maps any of "vin", "odometer", "plate" and "customer" to an image
+    path. ocr_results holds read_local results already computed for some of
+    those keys, which are handed to their extractors instead of re-running
+    OCR. Returns a dict with the same keys holding each extractor's result,
+    or the exception it raised.
+    """
+    ocr_results = ocr_results or {}
+    keys = list(paths)
+    results = await asyncio.gather(
+        *(
+            IMAGE_EXTRACTORS[key](paths[key], ocr_results[key])
+            if key in ocr_results
+            else IMAGE_EXTRACTORS[key](paths[key])
+            for key in keys
+        ),
+        return_exceptions=True,
+    )
+    return dict(zip(keys, results))
+
+
+# What each image shows and the JSON field the combined prompt asks for
+_COMBINED_FIELDS = {
+    "vin": ("a door placard", '"vin": the 17-character VIN'),
+    "odometer": (
+        "an odometer",
+        '"mileage": the odometer reading in miles, digits only',
+    ),
+    "plate": ("a vehicle's license plate", '"license": the license plate number'),
+    "customer": (
+        "a business card or form",
+        '"customer": an object with "first_name", "last_name", "email", "phone" '
+        'and "address" (empty strings for anything not visible)',
+    ),
+}
+
+
+def _validate_combined(key, value):
+    """Normalize one field of the combined reply, or return None if unusable"""
+    if key == "vin":
+        return find_vin(value) if isinstance(value, str) else None
+    if key == "odometer":
+        mileage_match = _MILEAGE_RE.search(str(value)) if value else None
+        return mileage_match.group(0).replace(",", "") if mileage_match else None
+    if key == "plate":
+        return value.strip() if isinstance(value, str) and value.strip() else None
+    return value if isinstance(value, dict) else None
+
+
+async def extract_all_one_call(paths):
+    """Read several images with a single multi-image Vision API request
+
+    Takes and returns the same dicts as extract_all. Odometer and plate are
+    tried with local OCR first when it is enabled. Any field missing from
+    the reply or failing validation is retried with its own extractor.
+    """
+    ocr_results = {}
+    local_keys = [key for key in _OCR_ALLOWLISTS if key in paths]
+    if ocr_reader is not None and local_keys:
+        local = await asyncio.gather(
+            *(read_local(key, paths[key]) for key in local_keys)
+        )
+        ocr_results = dict(zip(local_keys, local))
+    results = {key: value for key, value in ocr_results.items() if value}
+
+    keys = [key for key in _COMBINED_FIELDS if key in paths and key not in results]
+    if len(keys) < 2:
+        missing = {key: paths[key] for key in keys}
+        results.update(await extract_all(missing, ocr_results))
+        return results
+
+    try:
+        image_urls = await asyncio.gather(*(image_url_for(paths[key]) for key in keys))
+
+        lines = [
+            f"Image {i}: {_COMBINED_FIELDS[key][0]}." for i, key in enumerate(keys, 1)
+        ]
+        fields = [_COMBINED_FIELDS[key][1] for key in keys]
+        prompt = (
+            "\n".join(lines)
+            + "\nReturn ONLY a JSON object with these fields:\n- "
+            + "\n- ".join(fields)
+            + "\nUse an empty string for anything you can't read."
+        )
+        content = [{"type": "text", "text": prompt}] + [
+            {"type": "image_url", "image_url": {"url": image_url}}
+            for image_url in image_urls
+        ]
+        payload = {
+            "model": "gpt-4o",
+            "messages": [{"role": "user", "content": content}],
+            "max_tokens": 400,
+            "temperature": 0,
+            "seed": 42,
+            "response_format": {"type": "json_object"},
+        }
+
+        result = _reply_text(await _call_openai(payload))
+        reply = orjson.loads(result)
+        logger.debug("Combined extraction: %s", reply)
+        reply_keys = {"odometer": "mileage", "plate": "license"}
+        for key in keys:
+            value = _validate_combined(key, reply.get(reply_keys.get(key, key)))
+            if value is not None:
+                results[key] = value
+    except Exception as e:
+        logger.error("Combined image extraction failed: %s", e)
+
+    # Fall back to one request per image for anything still missing
+    missing = {key: paths[key] for key in paths if key not in results}
+    if missing:
+        results.update(await extract_all(missing, ocr_results))
+    return results
@@ -1,9 +1,11 @@
 import os
-import uuid
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
 import jinja2
-from dotenv import load_dotenv
+import aiofiles
 from io import BytesIO
 from reportlab.lib.pagesizes import letter
 from reportlab.lib import colors
@@ -18,11 +20,11 @@ from reportlab.platypus import (
 )
 from reportlab.lib.units import inch
 
-load_dotenv()
-
 # Configuration from environment variables
 INVOICE_DIR = os.getenv("INVOICE_DIR", "./invoices")
 TEMPLATE_DIR = os.getenv("TEMPLATE_DIR", "./backend/templates")
+# Unset means Jinja2's own per-user temp directory (created with mode 0700)
+JINJA_CACHE_DIR = os.getenv("JINJA_CACHE_DIR") or None
 COMPANY_NAME = os.getenv("COMPANY_NAME", "Auto Shop")
 COMPANY_ADDRESS = os.getenv("COMPANY_ADDRESS", "123 Main St, Anytown, USA")
 COMPANY_PHONE = os.getenv("COMPANY_PHONE", "(555) 123-4567")
@@ -32,10 +34,177 @@ COMPANY_WEBSITE = os.getenv("COMPANY_WEBSITE", "www.yourautoshop.com")
 # Ensure directories exist
 os.makedirs(INVOICE_DIR, exist_ok=True)
 os.makedirs(TEMPLATE_DIR, exist_ok=True)
+if JINJA_CACHE_DIR:
+    os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+
+# Worker processes for building PDFs, started on first use
+PDF_WORKERS = int(os.getenv("PDF_WORKERS") or os.cpu_count() or 1)
+_pdf_pool = None
+
+
+def get_pdf_pool():
+    """Get the process pool that builds PDFs, creating it on first use"""
+    global _pdf_pool
+    if _pdf_pool is None:
+        # The server already runs threads by now, so don't fork it directly
+        methods = multiprocessing.get_all_start_methods()
+        method = "forkserver" if "forkserver" in methods else "spawn"
+        _pdf_pool = ProcessPoolExecutor(
+            max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context(method)
+        )
+    return _pdf_pool
+
+
+def shutdown_pdf_pool():
+    """Stop the PDF worker processes, dropping any queued builds"""
+    global _pdf_pool
+    if _pdf_pool is not None:
+        _pdf_pool.shutdown(wait=False, cancel_futures=True)
+        _pdf_pool = None
+
+
+# Company info is the same on every invoice
+_STATIC_TEMPLATE_DATA = {
+    "company_name": COMPANY_NAME,
+    "company_address": COMPANY_ADDRESS,
+    "company_phone": COMPANY_PHONE,
+    "company_email": COMPANY_EMAIL,
+    "company_website": COMPANY_WEBSITE,
+}
+
+# Formats a number as dollars, e.g. "$12.50"
+_money = "${:.2f}".format
 
 # Set up jinja2 environment
 template_loader = jinja2.FileSystemLoader(searchpath=TEMPLATE_DIR)
-template_env = jinja2.Environment(loader=template_loader)
+# Compiled templates are also kept on disk, so new workers skip re-parsing
+template_env = jinja2.Environment(
+    loader=template_loader,
+    auto_reload=False,
+    cache_size=400,
+    bytecode_cache=jinja2.FileSystemBytecodeCache(JINJA_CACHE_DIR),
+)
+
+# Compile the invoice template once; if it isn't there yet, it is looked up
+# (and the error reported) when an invoice is generated
+try:
+    INVOICE_TEMPLATE = template_env.get_template("invoice_template.html")
+except jinja2.TemplateNotFound:
+    INVOICE_TEMPLATE = None
+
+
+def build_invoice_template_data(
+    work_order, customer=None, vehicle=None, is_estimate=False
+):
+    """Collect the values shown on an invoice, for both the HTML and PDF versions"""
+    # Determine document type
+    document_type = "ESTIMATE" if is_estimate else "INVOICE"
+
+    # Prepare customer data
+    customer_data = {}
+    if customer:
+        customer_data = {
+            "name": f"{customer.first_name} {customer.last_name}",
+            "email": customer.email,
+            "phone": customer.phone,
+            "address": customer.address,
+        }
+    else:
+        # Use customer name from work order if available
+        customer_data = {
+            "name": (
+                work_order.customer_name if work_order.customer_name else "Customer"
+            ),
+            "email": "N/A",
+            "phone": "N/A",
+            "address": "N/A",
+        }
+
+    # Prepare vehicle data
+    vehicle_data = {}
+    if vehicle:
+        vehicle_data = {
+            "year": vehicle.year,
+            "make": vehicle.make,
+            "model": vehicle.model,
+            "vin": vehicle.vin,
+            "mileage": f"{vehicle.mileage:,}" if vehicle.mileage else "N/A",
+        }
+    else:
+        # Use vehicle info from work order if available
+        vi = work_order.vehicle_info or {}
+        vehicle_data = {
+            "year": vi.get("year", "N/A"),
+            "make": vi.get("make", "N/A"),
+            "model": vi.get("model", "N/A"),
+            "vin": vi.get("vin", "N/A"),
+            "mileage": f"{vi.get('mileage', 'N/A'):,}" if vi.get("mileage") else "N/A",
+        }
+
+    # Format line items
+    line_items = [
+        {
+            "description": item.get("description", ""),
+            "type": item.get("type", "").capitalize(),
+            "quantity": item.get("quantity", 0),
+            "unit_price": _money(item.get("unit_price", 0)),
+            "total": _money(item.get("total", 0)),
+        }
+        for item in work_order.line_items
+    ]
+
+    # Prepare template data
+    template_data = {
+        **_STATIC_TEMPLATE_DATA,
+        # Document info
+        "document_type": document_type,
+        "order_id": work_order.id[:8],
+        "date": datetime.now().strftime("%m/%d/%Y"),
+        # Customer info
+        "customer_name": customer_data["name"],
+        "customer_email": customer_data["email"],
+        "customer_phone": customer_data["phone"],
+        "customer_address": customer_data["address"],
+        # Vehicle info
+        "vehicle_year": vehicle_data["year"],
+        "vehicle_make": vehicle_data["make"],
+        "vehicle_model": vehicle_data["model"],
+        "vehicle_vin": vehicle_data["vin"],
+        "vehicle_mileage": vehicle_data["mileage"],
+        # Work info
+        "work_summary": work_order.work_summary,
+        "line_items": line_items,
+        "total_parts": _money(work_order.total_parts),
+        "total_labor": _money(work_order.total_labor),
+        "total": _money(work_order.total),
+        # Settings
+        "is_estimate": is_estimate,
+    }
+
+    return template_data
+
+
+def invoice_html_path(template_data):
+    """Path the HTML invoice or estimate for template_data is saved to"""
+    html_filename = (
+        f"{template_data['document_type'].lower()}_{template_data['order_id']}.html"
+    )
+    return os.path.join(INVOICE_DIR, html_filename)
+
+
+async def render_invoice_html(template_data, html_path):
+    """Render the invoice template, save it to html_path and return the HTML"""
+    # Load template
+    template = INVOICE_TEMPLATE or template_env.get_template("invoice_template.html")
+
+    # Render HTML
+    html_content = template.render(template_data)
+
+    # Save HTML file
+    async with aiofiles.open(html_path, "w", encoding="utf-8") as f:
+        await f.write(html_content)
+
+    return html_content
 
 
 async def generate_invoice_html(
@@ -51,117 +220,14 @@ async def generate_invoice_html(
         is_estimate: Boolean indicating if this is an estimate (True) or invoice (False)
 
     Returns:
-        tuple: (HTML content, file path)
+        tuple: (HTML content, file path, template data)
     """
     try:
-        # Determine document type
-        document_type = "ESTIMATE" if is_estimate else "INVOICE"
-
-        # Generate file name and path
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        unique_id = str(uuid.uuid4())[:8]
-        html_filename = f"{document_type.lower()}_{work_order.id[:8]}.html"
-        html_path = os.path.join(INVOICE_DIR, html_filename)
-
-        # Prepare customer data
-        customer_data = {}
-        if customer:
-            customer_data = {
-                "name": f"{customer.first_name} {customer.last_name}",
-                "email": customer.email,
-                "phone": customer.phone,
-                "address": customer.address,
-            }
-        else:
-            # Use customer name from work order if available
-            customer_data = {
-                "name": work_order.customer_name
-                if work_order.customer_name
-                else "Customer",
-                "email": "N/A",
-                "phone": "N/A",
-                "address": "N/A",
-            }
-
-        # Prepare vehicle data
-        vehicle_data = {}
-        if vehicle:
-            vehicle_data = {
-                "year": vehicle.year,
-                "make": vehicle.make,
-                "model": vehicle.model,
-                "vin": vehicle.vin,
-                "mileage": f"{vehicle.mileage:,}" if vehicle.mileage else "N/A",
-            }
-        else:
-            # Use vehicle info from work order if available
-            vi = work_order.vehicle_info or {}
-            vehicle_data = {
-                "year": vi.get("year", "N/A"),
-                "make": vi.get("make", "N/A"),
-                "model": vi.get("model", "N/A"),
-                "vin": vi.get("vin", "N/A"),
-                "mileage": f"{vi.get('mileage', 'N/A'):,}"
-                if vi.get("mileage")
-                else "N/A",
-            }
-
-        # Format line items
-        line_items = []
-        for item in work_order.line_items:
-            line_items.append(
-                {
-                    "description": item.get("description", ""),
-                    "type": item.get("type", "").capitalize(),
-                    "quantity": item.get("quantity", 0),
-                    "unit_price": f"${item.get('unit_price', 0):.2f}",
-                    "total": f"${item.get('total', 0):.2f}",
-                }
-            )
-
-        # Prepare template data
-        template_data = {
-            # Company info
-            "company_name": COMPANY_NAME,
-            "company_address": COMPANY_ADDRESS,
-            "company_phone": COMPANY_PHONE,
-            "company_email": COMPANY_EMAIL,
-            "company_website": COMPANY_WEBSITE,
-            # Document info
-            "document_type": document_type,
-            "order_id": work_order.id[:8],
-            "date": datetime.now().strftime("%m/%d/%Y"),
-            # Customer info
-            "customer_name": customer_data["name"],
-            "customer_email": customer_data["email"],
-            "customer_phone": customer_data["phone"],
-            "customer_address": customer_data["address"],
-            # Vehicle info
-            "vehicle_year": vehicle_data["year"],
-            "vehicle_make": vehicle_data["make"],
-            "vehicle_model": vehicle_data["model"],
-            "vehicle_vin": vehicle_data["vin"],
-            "vehicle_mileage": vehicle_data["mileage"],
-            # Work info
-            "work_summary": work_order.work_summary,
-            "line_items": line_items,
-            "total_parts": f"${work_order.total_parts:.2f}",
-            "total_labor": f"${work_order.total_labor:.2f}",
-            "total": f"${work_order.total:.2f}",
-            # Settings
-            "is_estimate": is_estimate,
-        }
-
-        # Load template
-        template = template_env.get_template("invoice_template.html")
-
-        # Render HTML
-        html_content = template.render(**template_data)
-
-        # Save HTML file
-        with open(html_path, "w", encoding="utf-8") as f:
-            f.write(html_content)
-
+        template_data = build_invoice_template_data(
+            work_order, customer, vehicle, is_estimate
+        )
+        html_path = invoice_html_path(template_data)
+        html_content = await render_invoice_html(template_data, html_path)
         return html_content, html_path, template_data
 
     except Exception as e:
@@ -172,293 +238,309 @@ async def generate_invoice_html(
         return None, None, None
 
 
-async def generate_pdf_with_reportlab(template_data, output_path=None):
-    """
-    Generate a PDF invoice directly with ReportLab
+# Paragraph and table styles for the ReportLab invoice, built once per process
+_STYLES = getSampleStyleSheet()
+_STYLES.add(
+    ParagraphStyle(
+        name="CenterHeading",
+        parent=_STYLES["Heading1"],
+        alignment=1,
+        spaceAfter=12,
+    )
+)
+_STYLES.add(ParagraphStyle(name="RightAligned", parent=_STYLES["Normal"], alignment=2))
+_STYLES.add(ParagraphStyle(name="SmallText", parent=_STYLES["Normal"], fontSize=8))
+
+# Vehicle table labels; the same for every invoice, so parsed only once
+_P_YEAR = Paragraph("<b>Year:</b>", _STYLES["Normal"])
+_P_MAKE = Paragraph("<b>Make:</b>", _STYLES["Normal"])
+_P_MODEL = Paragraph("<b>Model:</b>", _STYLES["Normal"])
+_P_VIN = Paragraph("<b>VIN:</b>", _STYLES["Normal"])
+_P_MILEAGE = Paragraph("<b>Mileage:</b>", _STYLES["Normal"])
+
+_HEADER_TABLE_STYLE = TableStyle(
+    [
+        ("ALIGN", (0, 0), (0, 0), "LEFT"),
+        ("ALIGN", (1, 0), (1, 0), "RIGHT"),
+        ("VALIGN", (0, 0), (1, 0), "TOP"),
+    ]
+)
 
-    Args:
-        template_data: Data dictionary used for the HTML template
-        output_path: Path for output PDF file (optional)
+_CUSTOMER_TABLE_STYLE = TableStyle(
+    [
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("BACKGROUND", (0, 0), (0, -1), colors.lightgrey),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
+        ("LEFTPADDING", (0, 0), (-1, -1), 6),
+        ("RIGHTPADDING", (0, 0), (-1, -1), 6),
+    ]
+)
 
-    Returns:
-        str: Path to generated PDF file
-    """
-    try:
-        # Generate a filename if not provided
-        if not output_path:
-            document_type = (
-                "estimate" if template_data.get("is_estimate", False) else "invoice"
-            )
-            timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-            unique_id = str(uuid.uuid4())[:8]
-            filename = f"{document_type}_{template_data['order_id']}_{timestamp}.pdf"
-            output_path = os.path.join(INVOICE_DIR, filename)
+_VEHICLE_TABLE_STYLE = TableStyle(
+    [
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("BACKGROUND", (0, 0), (0, -1), colors.lightgrey),
+        ("BACKGROUND", (2, 0), (2, -1), colors.lightgrey),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ("LEFTPADDING", (0, 0), (-1, -1), 6),
+        ("RIGHTPADDING", (0, 0), (-1, -1), 6),
+    ]
+)
 
-        # Set up the document
-        doc = SimpleDocTemplate(
-            output_path,
-            pagesize=letter,
-            rightMargin=0.5 * inch,
-            leftMargin=0.5 * inch,
-            topMargin=0.5 * inch,
-            bottomMargin=0.5 * inch,
-        )
+_LINE_ITEMS_STYLE = TableStyle(
+    [
+        # Header row
+        ("BACKGROUND", (0, 0), (-1, 0), colors.blue),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+        ("ALIGN", (0, 0), (-1, 0), "CENTER"),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
+        # Data rows - alternate colors
+        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.lightgrey, colors.white]),
+        ("ALIGN", (2, 1), (-1, -1), "RIGHT"),  # Right align numbers
+        # Grid
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        # Padding
+        ("LEFTPADDING", (0, 0), (-1, -1), 6),
+        ("RIGHTPADDING", (0, 0), (-1, -1), 6),
+    ]
+)
 
-        # Styles
-        styles = getSampleStyleSheet()
-        styles.add(
-            ParagraphStyle(
-                name="CenterHeading",
-                parent=styles["Heading1"],
-                alignment=1,
-                spaceAfter=12,
-            )
-        )
-        styles.add(
-            ParagraphStyle(name="RightAligned", parent=styles["Normal"], alignment=2)
-        )
-        styles.add(
-            ParagraphStyle(name="SmallText", parent=styles["Normal"], fontSize=8)
-        )
+_TOTALS_STYLE = TableStyle(
+    [
+        # Align totals to right
+        ("ALIGN", (3, 0), (3, -1), "RIGHT"),
+        ("ALIGN", (4, 0), (4, -1), "RIGHT"),
+        # Bold font for totals
+        ("FONTNAME", (3, 0), (4, -1), "Helvetica-Bold"),
+        # Grand total row
+        ("LINEABOVE", (3, 2), (4, 2), 1, colors.black),
+        ("LINEBELOW", (3, 2), (4, 2), 1, colors.black),
+    ]
+)
 
-        # Build the document elements
-        elements = []
 
-        # Header table - Company info and document info
-        header_data = [
+def build_invoice_pdf(template_data):
+    """Lay out the invoice PDF and return its bytes; runs in the PDF worker pool"""
+    # Set up the document
+    buf = BytesIO()
+    doc = SimpleDocTemplate(
+        buf,
+        pagesize=letter,
+        rightMargin=0.5 * inch,
+        leftMargin=0.5 * inch,
+        topMargin=0.5 * inch,
+        bottomMargin=0.5 * inch,
+    )
+
+    # Build the document elements
+    elements = []
+
+    # Header table - Company info and document info
+    header_data = [
+        [
+            # Company info
             [
-                # Company info
-                [
-                    Paragraph(
-                        f"<b>{template_data['company_name']}</b>", styles["Heading2"]
-                    ),
-                    Paragraph(template_data["company_address"], styles["Normal"]),
-                    Paragraph(
-                        f"Phone: {template_data['company_phone']}", styles["Normal"]
-                    ),
-                    Paragraph(
-                        f"Email: {template_data['company_email']}", styles["Normal"]
-                    ),
-                    Paragraph(
-                        f"Website: {template_data['company_website']}", styles["Normal"]
-                    ),
-                ],
-                # Document info
-                [
-                    Paragraph(
-                        f"<b>{template_data['document_type']}</b>",
-                        styles["RightAligned"],
-                    ),
-                    Paragraph(
-                        f"<b>Number:</b> {template_data['order_id']}",
-                        styles["RightAligned"],
-                    ),
-                    Paragraph(
-                        f"<b>Date:</b> {template_data['date']}", styles["RightAligned"]
-                    ),
-                ],
-            ]
+                Paragraph(
+                    f"<b>{template_data['company_name']}</b>", _STYLES["Heading2"]
+                ),
+                Paragraph(template_data["company_address"], _STYLES["Normal"]),
+                Paragraph(
+                    f"Phone: {template_data['company_phone']}", _STYLES["Normal"]
+                ),
+                Paragraph(
+                    f"Email: {template_data['company_email']}", _STYLES["Normal"]
+                ),
+                Paragraph(
+                    f"Website: {template_data['company_website']}", _STYLES["Normal"]
+                ),
+            ],
+            # Document info
+            [
+                Paragraph(
+                    f"<b>{template_data['document_type']}</b>",
+                    _STYLES["RightAligned"],
+                ),
+                Paragraph(
+                    f"<b>Number:</b> {template_data['order_id']}",
+                    _STYLES["RightAligned"],
+                ),
+                Paragraph(
+                    f"<b>Date:</b> {template_data['date']}", _STYLES["RightAligned"]
+                ),
+            ],
         ]
+    ]
+
+    header_table = Table(header_data, colWidths=[4 * inch, 3 * inch])
+    header_table.setStyle(_HEADER_TABLE_STYLE)
+    elements.append(header_table)
+    elements.append(Spacer(1, 20))
+
+    # Customer Information
+    elements.append(Paragraph("Customer Information", _STYLES["Heading3"]))
+    customer_data = [
+        ["Name:", template_data["customer_name"]],
+    ]
+    if template_data["customer_phone"] != "N/A":
+        customer_data.append(["Phone:", template_data["customer_phone"]])
+    if template_data["customer_email"] != "N/A":
+        customer_data.append(["Email:", template_data["customer_email"]])
+    if template_data["customer_address"] != "N/A":
+        customer_data.append(["Address:", template_data["customer_address"]])
+
+    customer_table = Table(customer_data, colWidths=[1 * inch, 6 * inch])
+    customer_table.setStyle(_CUSTOMER_TABLE_STYLE)
+    elements.append(customer_table)
+    elements.append(Spacer(1, 15))
+
+    # Vehicle Information
+    elements.append(Paragraph("Vehicle Information", _STYLES["Heading3"]))
+    vehicle_table = Table(
+        [
+            [
+                _P_YEAR,
+                template_data["vehicle_year"],
+                _P_MAKE,
+                template_data["vehicle_make"],
+            ],
+            [
+                _P_MODEL,
+                template_data["vehicle_model"],
+                _P_VIN,
+                template_data["vehicle_vin"],
+            ],
+            [
+                _P_MILEAGE,
+                template_data["vehicle_mileage"],
+                "",
+                "",
+            ],
+        ],
+        colWidths=[0.75 * inch, 2.5 * inch, 0.75 * inch, 3 * inch],
+    )
 
-        header_table = Table(header_data, colWidths=[4 * inch, 3 * inch])
-        header_table.setStyle(
-            TableStyle(
-                [
-                    ("ALIGN", (0, 0), (0, 0), "LEFT"),
-                    ("ALIGN", (1, 0), (1, 0), "RIGHT"),
-                    ("VALIGN", (0, 0), (1, 0), "TOP"),
-                ]
-            )
-        )
-        elements.append(header_table)
-        elements.append(Spacer(1, 20))
+    vehicle_table.setStyle(_VEHICLE_TABLE_STYLE)
+    elements.append(vehicle_table)
+    elements.append(Spacer(1, 15))
 
-        # Customer Information
-        elements.append(Paragraph("Customer Information", styles["Heading3"]))
-        customer_data = [
-            ["Name:", template_data["customer_name"]],
-        ]
-        if template_data["customer_phone"] != "N/A":
-            customer_data.append(["Phone:", template_data["customer_phone"]])
-        if template_data["customer_email"] != "N/A":
-            customer_data.append(["Email:", template_data["customer_email"]])
-        if template_data["customer_address"] != "N/A":
-            customer_data.append(["Address:", template_data["customer_address"]])
-
-        customer_table = Table(customer_data, colWidths=[1 * inch, 6 * inch])
-        customer_table.setStyle(
-            TableStyle(
-                [
-                    ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-                    ("BACKGROUND", (0, 0), (0, -1), colors.lightgrey),
-                    ("VALIGN", (0, 0), (-1, -1), "TOP"),
-                    ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
-                    ("LEFTPADDING", (0, 0), (-1, -1), 6),
-                    ("RIGHTPADDING", (0, 0), (-1, -1), 6),
-                ]
-            )
-        )
-        elements.append(customer_table)
-        elements.append(Spacer(1, 15))
+    # Work Summary
+    elements.append(Paragraph("Work Summary", _STYLES["Heading3"]))
+    elements.append(Paragraph(template_data["work_summary"], _STYLES["Normal"]))
+    elements.append(Spacer(1, 15))
 
-        # Vehicle Information
-        elements.append(Paragraph("Vehicle Information", styles["Heading3"]))
-        vehicle_table = Table(
-            [
-                [
-                    Paragraph("<b>Year:</b>", styles["Normal"]),
-                    template_data["vehicle_year"],
-                    Paragraph("<b>Make:</b>", styles["Normal"]),
-                    template_data["vehicle_make"],
-                ],
-                [
-                    Paragraph("<b>Model:</b>", styles["Normal"]),
-                    template_data["vehicle_model"],
-                    Paragraph("<b>VIN:</b>", styles["Normal"]),
-                    template_data["vehicle_vin"],
-                ],
-                [
-                    Paragraph("<b>Mileage:</b>", styles["Normal"]),
-                    template_data["vehicle_mileage"],
-                    "",
-                    "",
-                ],
-            ],
-            colWidths=[0.75 * inch, 2.5 * inch, 0.75 * inch, 3 * inch],
-        )
+    # Line Items
+    elements.append(Paragraph("Line Items", _STYLES["Heading3"]))
 
-        vehicle_table.setStyle(
-            TableStyle(
-                [
-                    ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-                    ("BACKGROUND", (0, 0), (0, -1), colors.lightgrey),
-                    ("BACKGROUND", (2, 0), (2, -1), colors.lightgrey),
-                    ("VALIGN", (0, 0), (-1, -1), "TOP"),
-                    ("LEFTPADDING", (0, 0), (-1, -1), 6),
-                    ("RIGHTPADDING", (0, 0), (-1, -1), 6),
-                ]
-            )
-        )
-        elements.append(vehicle_table)
-        elements.append(Spacer(1, 15))
-
-        # Work Summary
-        elements.append(Paragraph("Work Summary", styles["Heading3"]))
-        elements.append(Paragraph(template_data["work_summary"], styles["Normal"]))
-        elements.append(Spacer(1, 15))
-
-        # Line Items
-        elements.append(Paragraph("Line Items", styles["Heading3"]))
-
-        # Create table headers
-        line_items_data = [["Description", "Type", "Quantity", "Unit Price", "Total"]]
-
-        # Add line items
-        for item in template_data["line_items"]:
-            line_items_data.append(
-                [
-                    item["description"],
-                    item["type"],
-                    str(item["quantity"]),
-                    item["unit_price"],
-                    item["total"],
-                ]
-            )
+    # Create table headers
+    line_items_data = [["Description", "Type", "Quantity", "Unit Price", "Total"]]
 
-        # Calculate column widths
-        line_items_table = Table(
-            line_items_data,
-            colWidths=[3.5 * inch, 1 * inch, 0.75 * inch, 1 * inch, 0.75 * inch],
+    # Add line items
+    for item in template_data["line_items"]:
+        line_items_data.append(
+            [
+                item["description"],
+                item["type"],
+                str(item["quantity"]),
+                item["unit_price"],
+                item["total"],
+            ]
         )
 
-        # Style the table
-        line_items_table.setStyle(
-            TableStyle(
-                [
-                    # Header row
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.blue),
-                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-                    ("ALIGN", (0, 0), (-1, 0), "CENTER"),
-                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                    ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
-                    # Data rows - alternate colors
-                    ("BACKGROUND", (0, 1), (-1, -1), colors.white),
-                    ("ALIGN", (2, 1), (-1, -1), "RIGHT"),  # Right align numbers
-                    # Grid
-                    ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-                    # Padding
-                    ("LEFTPADDING", (0, 0), (-1, -1), 6),
-                    ("RIGHTPADDING", (0, 0), (-1, -1), 6),
-                ]
-            )
-        )
+    # Calculate column widths
+    line_items_table = Table(
+        line_items_data,
+        colWidths=[3.5 * inch, 1 * inch, 0.75 * inch, 1 * inch, 0.75 * inch],
+    )
 
-        # Apply zebra striping
-        for i in range(1, len(line_items_data), 2):
-            line_items_table.setStyle(
-                TableStyle([("BACKGROUND", (0, i), (-1, i), colors.lightgrey)])
-            )
+    # Style the table
+    line_items_table.setStyle(_LINE_ITEMS_STYLE)
 
-        elements.append(line_items_table)
-        elements.append(Spacer(1, 15))
+    elements.append(line_items_table)
+    elements.append(Spacer(1, 15))
 
-        # Totals
-        totals_data = [
-            ["", "", "", "Parts Total:", template_data["total_parts"]],
-            ["", "", "", "Labor Total:", template_data["total_labor"]],
-            ["", "", "", "GRAND TOTAL:", template_data["total"]],
-        ]
+    # Totals
+    totals_data = [
+        ["", "", "", "Parts Total:", template_data["total_parts"]],
+        ["", "", "", "Labor Total:", template_data["total_labor"]],
+        ["", "", "", "GRAND TOTAL:", template_data["total"]],
+    ]
 
-        totals_table = Table(
-            totals_data,
-            colWidths=[3.5 * inch, 1 * inch, 0.75 * inch, 1 * inch, 0.75 * inch],
-        )
+    totals_table = Table(
+        totals_data,
+        colWidths=[3.5 * inch, 1 * inch, 0.75 * inch, 1 * inch, 0.75 * inch],
+    )
 
-        totals_table.setStyle(
-            TableStyle(
-                [
-                    # Align totals to right
-                    ("ALIGN", (3, 0), (3, -1), "RIGHT"),
-                    ("ALIGN", (4, 0), (4, -1), "RIGHT"),
-                    # Bold font for totals
-                    ("FONTNAME", (3, 0), (4, -1), "Helvetica-Bold"),
-                    # Grand total row
-                    ("LINEABOVE", (3, 2), (4, 2), 1, colors.black),
-                    ("LINEBELOW", (3, 2), (4, 2), 1, colors.black),
-                ]
-            )
-        )
+    totals_table.setStyle(_TOTALS_STYLE)
 
-        elements.append(totals_table)
-        elements.append(Spacer(1, 20))
+    elements.append(totals_table)
+    elements.append(Spacer(1, 20))
 
-        # Footer
-        if template_data.get("is_estimate", False):
-            elements.append(
-                Paragraph(
-                    "<b>PLEASE NOTE:</b> This is an ESTIMATE only. Actual charges may vary based on additional parts or labor required. This estimate is valid for 30 days.",
-                    styles["Normal"],
-                )
-            )
-        else:
-            elements.append(
-                Paragraph(
-                    "<b>PAYMENT TERMS:</b> Payment due upon completion of service. We accept cash, checks, and all major credit cards.",
-                    styles["Normal"],
-                )
+    # Footer
+    if template_data.get("is_estimate", False):
+        elements.append(
+            Paragraph(
+                "<b>PLEASE NOTE:</b> This is an ESTIMATE only. Actual charges may vary based on additional parts or labor required. This estimate is valid for 30 days.",
+                _STYLES["Normal"],
             )
-
-        elements.append(Spacer(1, 10))
+        )
+    else:
         elements.append(
             Paragraph(
-                f"Thank you for choosing {template_data['company_name']} for your vehicle maintenance needs. We appreciate your business!",
-                styles["Normal"],
+                "<b>PAYMENT TERMS:</b> Payment due upon completion of service. We accept cash, checks, and all major credit cards.",
+                _STYLES["Normal"],
             )
         )
 
-        # Build the PDF
-        doc.build(elements)
+    elements.append(Spacer(1, 10))
+    elements.append(
+        Paragraph(
+            f"Thank you for choosing {template_data['company_name']} for your vehicle maintenance needs. We appreciate your business!",
+            _STYLES["Normal"],
+        )
+    )
+
+    # Build the PDF
+    doc.build(elements)
+
+    return buf.getvalue()
+
 
+async def generate_pdf_with_reportlab(
+    template_data, output_path=None, save_to_disk=True
+):
+    """
+    Generate a PDF invoice directly with ReportLab
+
+    Args:
+        template_data: Data dictionary used for the HTML template
+        output_path: Path for output PDF file (optional)
+        save_to_disk: Write the PDF to output_path (True) or just return its bytes
+
+    Returns:
+        str: Path to generated PDF file, or bytes when save_to_disk is False
+    """
+    try:
+        # ReportLab is pure Python and CPU-bound, so build in another process
+        loop = asyncio.get_running_loop()
+        pdf_bytes = await loop.run_in_executor(
+            get_pdf_pool(), build_invoice_pdf, template_data
+        )
+        if not save_to_disk:
+            return pdf_bytes
+
+        # Generate a filename if not provided
+        if not output_path:
+            document_type = (
+                "estimate" if template_data.get("is_estimate", False) else "invoice"
+            )
+            timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+            filename = f"{document_type}_{template_data['order_id']}_{timestamp}.pdf"
+            output_path = os.path.join(INVOICE_DIR, filename)
+
+        async with aiofiles.open(output_path, "wb") as f:
+            await f.write(pdf_bytes)
         return output_path
 
     except Exception as e:
@@ -467,3 +549,39 @@ async def generate_pdf_with_reportlab(template_data, output_path=None):
 
         traceback.print_exc()
         return None
+
+
+async def generate_invoice_html_and_pdf(
+    work_order, customer=None, vehicle=None, is_estimate=False
+):
+    """
+    Generate the HTML and PDF versions of an invoice or estimate concurrently
+
+    Args:
+        work_order: WorkOrder database object
+        customer: Customer database object (optional)
+        vehicle: Vehicle database object (optional)
+        is_estimate: Boolean indicating if this is an estimate (True) or invoice (False)
+
+    Returns:
+        tuple: (HTML content, HTML file path, PDF file path)
+    """
+    try:
+        template_data = build_invoice_template_data(
+            work_order, customer, vehicle, is_estimate
+        )
+        html_path = invoice_html_path(template_data)
+
+        # The HTML write and the PDF build only share template_data
+        html_content, pdf_path = await asyncio.gather(
+            render_invoice_html(template_data, html_path),
+            generate_pdf_with_reportlab(template_data),
+        )
+        return html_content, html_path, pdf_path
+
+    except Exception as e:
+        print(f"Error generating HTML invoice: {e}")
+        import traceback
+
+        traceback.print_exc()
+        return None, None, None
@@ -1,5 +1,20 @@
 from api.models import VehicleBase
-from .vin_decoder import get_vehicle_info
+from .vin_decoder import get_vehicle_info, get_vehicle_info_batch
+
+
+def _vehicle_from_row(vin: str, row: dict) -> VehicleBase:
+    """Build a VehicleBase from a flat NHTSA DecodeVinValues result row"""
+    # Flat rows use "" for unknown values
+    return VehicleBase(
+        id="",
+        customer_id="",
+        vin=vin,
+        year=row.get("ModelYear") or None,
+        make=row.get("Make") or None,
+        model=row.get("Model") or None,
+        engine_size=row.get("DisplacementL") or None,
+        engine_code=row.get("EngineModel") or None,
+    )
 
 
 async def get_year_make_model(vin: str) -> VehicleBase:
@@ -7,42 +22,21 @@ async def get_year_make_model(vin: str) -> VehicleBase:
     response = await get_vehicle_info(vin)
 
     # Make sure we have Results in the response
-    if not response or "Results" not in response:
+    if not response or not response.get("Results"):
         print(f"Invalid response for VIN: {vin}")
         return VehicleBase(
             id="", customer_id="", vin=vin, year=None, make=None, model=None
         )
 
-    results = response["Results"]
-    year = None
-    make = None
-    model = None
-    engine_size = None
-    cylinders = None
-
-    # Loop through all the result items to find what we need
-    for item in results:
-        if not isinstance(item, dict):
-            continue
-
-        variable = item.get("Variable")
-        if not variable:
-            continue
-
-        if variable == "Model Year":
-            year = item.get("Value")
-        elif variable == "Make":
-            make = item.get("Value")
-        elif variable == "Model":
-            model = item.get("Value")
-        elif variable == "Engine Model":
-            engine_code = item.get("Value")
-        elif variable == "Displacement (L)":  # Engine size
-            engine_size = item.get("Value")
+    vehicle = _vehicle_from_row(vin, response["Results"][0])
 
     # Debug info
-    print(f"VIN: {vin}, Year: {year}, Make: {make}, Model: {model}, Engine Size: {engine_size}, Engine Code: {engine_code}")
+    print(f"VIN: {vin}, Year: {vehicle.year}, Make: {vehicle.make}, Model: {vehicle.model}, Engine Size: {vehicle.engine_size}, Engine Code: {vehicle.engine_code}")
 
-    return VehicleBase(
-        id="", customer_id="", vin=vin, year=year, make=make, model=model, engine_size=engine_size, engine_code=engine_code
-    )
+    return vehicle
+
+
+async def get_year_make_model_batch(vins: list[str]) -> list[VehicleBase]:
+    """Get year, make, and model for several VINs with a single NHTSA request"""
+    rows = {row.get("VIN"): row for row in await get_vehicle_info_batch(vins)}
+    return [_vehicle_from_row(vin, rows.get(vin, {})) for vin in vins]
@@ -1,20 +1,72 @@
-import json
-import asyncio
-import httpx
+import os
+from cachetools import LRUCache
+
+from services.http_client import get_nhtsa_client
+
+# A VIN always decodes to the same vehicle, so successful lookups are kept
+VIN_CACHE_SIZE = int(os.getenv("VIN_CACHE_SIZE", "4096"))
+_vin_cache = LRUCache(maxsize=VIN_CACHE_SIZE)
 
 
 async def get_vehicle_info(vin):
-    """Get vehicle information from NHTSA API"""
-    link = f"https://vpic.nhtsa.dot.gov/api/vehicles/decodevin/{vin}?format=json"
+    """Get vehicle information from NHTSA API
+
+    Uses the flat DecodeVinValues endpoint, so Results holds one row keyed
+    by variable name (e.g. "ModelYear") rather than a list of variables.
+    Successful responses are cached in memory by VIN.
+    """
+    cached = _vin_cache.get(vin)
+    if cached is not None:
+        return cached
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(link)
-            if response.status_code == 200:
-                data = response.json()
-                return data
-            else:
-                print(f"NHTSA API error: {response.text}")
-                return {}
+        client = get_nhtsa_client()
+        response = await client.get(
+            f"/DecodeVinValues/{vin}", params={"format": "json"}
+        )
+        if response.status_code == 200:
+            data = response.json()
+            if data.get("Results"):
+                _vin_cache[vin] = data
+            return data
+        else:
+            print(f"NHTSA API error: {response.text}")
+            return {}
     except Exception as e:
         print(f"Error getting vehicle info: {e}")
         return {}
+
+
+async def get_vehicle_info_batch(vins):
+    """Decode several VINs with one request to NHTSA's batch endpoint
+
+    Returns the flat result rows (keyed by variable name, e.g. "ModelYear").
+    VINs already in the cache are not sent; on error only the cached rows
+    are returned.
+    """
+    rows = []
+    missing = []
+    for vin in vins:
+        cached = _vin_cache.get(vin)
+        if cached is not None:
+            rows.append(cached["Results"][0])
+        else:
+            missing.append(vin)
+    if not missing:
+        return rows
+    try:
+        client = get_nhtsa_client()
+        response = await client.post(
+            "/DecodeVINValuesBatch/",
+            data={"format": "json", "data": ";".join(missing)},
+        )
+        if response.status_code == 200:
+            for row in response.json().get("Results", []):
+                if row.get("VIN"):
+                    # Same shape as a single DecodeVinValues response
+                    _vin_cache[row["VIN"]] = {"Results": [row]}
+                rows.append(row)
+        else:
+            print(f"NHTSA API error: {response.text}")
+    except Exception as e:
+        print(f"Error getting vehicle info: {e}")
+    return rows
@@ -0,0 +1,57 @@
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from database import cache
+from database.db import Base, SessionLocal, engine
+from database.repos import CustomerRepository, VehicleRepository
+
+
+def setup_function():
+    Base.metadata.create_all(bind=engine)
+
+
+def teardown_function():
+    Base.metadata.drop_all(bind=engine)
+
+
+def _is_cached(key):
+    """True if key is served from the cache instead of the loader"""
+    return cache.get_or_load(key, lambda: "reloaded") != "reloaded"
+
+
+def _prime(customer_id):
+    cache.get_or_load(f"customer:{customer_id}", lambda: "cached")
+    cache.get_or_load("customers", lambda: "cached")
+
+
+def test_vehicle_create_and_delete_invalidate_cached_customer():
+    db = SessionLocal()
+    try:
+        customer = CustomerRepository.create(
+            db,
+            {
+                "first_name": "Ada",
+                "last_name": "Lovelace",
+                "email": "ada@example.com",
+                "phone": "555-0100",
+                "address": "",
+                "vehicles": [],
+            },
+        )
+
+        _prime(customer.id)
+        vehicle = VehicleRepository.create(
+            db, {"customer_id": customer.id, "vin": "1HGCM82633A004352"}
+        )
+        assert not _is_cached(f"customer:{customer.id}")
+        assert not _is_cached("customers")
+        assert CustomerRepository.get_by_id(db, customer.id).vehicles == [vehicle.id]
+
+        cache.invalidate(f"customer:{customer.id}", "customers")
+        _prime(customer.id)
+        VehicleRepository.delete(db, vehicle.id)
+        assert not _is_cached(f"customer:{customer.id}")
+        assert not _is_cached("customers")
+    finally:
+        db.close()